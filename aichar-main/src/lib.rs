@@ -28,7 +28,7 @@ use base64::{Engine, engine::GeneralPurpose, engine::GeneralPurposeConfig, alpha
 use png::Decoder;
 use chrono::Utc;
 use std::{fs, fs::File};
-use std::io::{Read, Write, Cursor, BufReader, Seek, SeekFrom};
+use std::io::{Read, Write};
 
 
 static PROGRAM_INFO: ProgramInfo = ProgramInfo {
@@ -637,123 +637,26 @@ fn load_character_yaml_file(path: &str) -> PyResult<CharacterClass> {
 
 #[pyfunction]
 fn load_character_card(bytes: &[u8]) -> PyResult<CharacterClass> {
-    let decoder = png::Decoder::new(Cursor::new(bytes));
-    let reader = decoder.read_info().map_err(|e| pyo3::exceptions::PyValueError::new_err(format!("Failed to read PNG info: {}", e)))?;
-    let character_base64_option: Option<String> = reader.info().uncompressed_latin1_text.iter()
-        .filter(|text_chunk| text_chunk.keyword == "chara")
-        .map(|text_chunk| text_chunk.text.clone())
-        .next();
-    let character_base64: String = match character_base64_option {
-        Some(v) => v,
-        None => {
-            let text_chunk_start = bytes.windows(9).position(|window| window == b"tEXtchara").ok_or_else(|| 
-                pyo3::exceptions::PyValueError::new_err(
-                    r#"Failed to find 'chara' metadata (tEXt chunk) in the PNG file. This may occur due to:
-            1. The file is not a valid character card (Tavern Card V1 format).
-            2. The file may be corrupted or incomplete.
-            3. The character data might be stored in a different format.
-            
-            Please ensure that:
-            - You are using a file created by a compatible character creation tool.
-            - The file hasn't been modified or damaged.
-            - You are using the correct file format for your character data.
-            
-            If the problem persists, try re-exporting the character from its original creation tool."#
-                ))?;
-            let text_chunk_end = bytes.windows(4).rposition(|window| window == b"IEND").ok_or_else(|| 
-                pyo3::exceptions::PyValueError::new_err(
-                    r#"Failed to find 'chara' metadata (tEXt chunk) in the PNG file. This may occur due to:
-            1. The file is not a valid character card (Tavern Card V1 format).
-            2. The file may be corrupted or incomplete.
-            3. The character data might be stored in a different format.
-            
-            Please ensure that:
-            - You are using a file created by a compatible character creation tool.
-            - The file hasn't been modified or damaged.
-            - You are using the correct file format for your character data.
-            
-            If the problem persists, try re-exporting the character from its original creation tool."#
-                ))?;
-            String::from_utf8_lossy(&bytes[text_chunk_start + 10..text_chunk_end - 8]).to_string()
-        }
-    };
-    let engine = GeneralPurpose::new(&STANDARD, GeneralPurposeConfig::new());
-    let character_bytes = match engine.decode(character_base64) {
-        Ok(b) => b,
-        Err(e) => {
-            return Err(pyo3::exceptions::PyValueError::new_err(format!(
-                "Error while decoding base64 character data from character card: {:?}",
-                e
-            )));
-        }
-    };
-    let character_text: &str = match std::str::from_utf8(&character_bytes) {
-        Ok(s) => s,
-        Err(e) => {
-            return Err(pyo3::exceptions::PyValueError::new_err(format!(
-                "Error while parsing decoded base64 bytes to utf8 string: {:?}",
-                e
-            )));
-        }
-    };
-    let char_data: LoadCharacterClass =
-        serde_json::from_str(character_text).expect("Your image file does not contain correct json data");
-
-    Ok(CharacterClass {
-        name: char_data.char_name.unwrap_or(char_data.name.unwrap_or(String::from(""))),
-        summary: char_data.summary.unwrap_or(char_data.description.unwrap_or(String::from(""))),
-        personality: char_data.char_persona.unwrap_or(char_data.personality.unwrap_or(String::from(""))),
-        scenario: char_data.world_scenario.unwrap_or(char_data.scenario.unwrap_or(String::from(""))),
-        greeting_message: char_data.char_greeting.unwrap_or(char_data.first_mes.unwrap_or(String::from(""))),
-        example_messages: char_data.example_dialogue.unwrap_or(char_data.mes_example.unwrap_or(String::from(""))),
-        image_path: None,
-        created_time: char_data.metadata.and_then(|time_metadata| time_metadata.created),
-    })
+    character_from_card(bytes, None)
 }
 
 #[pyfunction]
 fn load_character_card_file(path: &str) -> PyResult<CharacterClass> {
-    let file = File::open(path)?;
-    let mut reader = BufReader::new(file);
-    
-    let decoder = png::Decoder::new(&mut reader);
-    let reader_info = decoder.read_info().map_err(|e| pyo3::exceptions::PyValueError::new_err(format!("Failed to read PNG info: {}", e)))?;
-    let character_base64 = reader_info.info().uncompressed_latin1_text.iter()
-        .find(|text_chunk| text_chunk.keyword == "chara")
-        .map(|text_chunk| text_chunk.text.clone());
-
-    let character_base64 = if let Some(base64) = character_base64 {
-        base64
-    } else {
-        reader.seek(SeekFrom::Start(0))?;
-        let mut buffer = Vec::new();
-        reader.read_to_end(&mut buffer)?;
-
-        find_chara_chunk(&buffer)
-            .ok_or_else(|| 
-                pyo3::exceptions::PyValueError::new_err(
-                    r#"Failed to find 'chara' metadata (tEXt chunk) in the PNG file. This may occur due to:
-            1. The file is not a valid character card (Tavern Card V1 format).
-            2. The file may be corrupted or incomplete.
-            3. The character data might be stored in a different format.
-            
-            Please ensure that:
-            - You are using a file created by a compatible character creation tool.
-            - The file hasn't been modified or damaged.
-            - You are using the correct file format for your character data.
-            
-            If the problem persists, try re-exporting the character from its original creation tool."#
-                ))?
-    };
+    let buffer = fs::read(path)?;
+    character_from_card(&buffer, Some(path.to_string()))
+}
+
+fn character_from_card(bytes: &[u8], image_path: Option<String>) -> PyResult<CharacterClass> {
+    let character_base64 = find_text_chunk(bytes, b"chara")
+        .ok_or_else(|| pyo3::exceptions::PyValueError::new_err(CHARA_CHUNK_MISSING))?;
 
+    // Decode straight from the chunk slice and let serde_json validate the
+    // UTF-8 while parsing, rather than copying into Strings along the way.
     let engine = GeneralPurpose::new(&STANDARD, GeneralPurposeConfig::new());
     let character_bytes = engine.decode(character_base64)
         .map_err(|e| pyo3::exceptions::PyValueError::new_err(format!("Error while decoding base64 character data: {:?}", e)))?;
 
-    let character_text = std::str::from_utf8(&character_bytes)
-        .map_err(|e| pyo3::exceptions::PyValueError::new_err(format!("Error while parsing decoded base64 bytes to utf8 string: {:?}", e)))?;
-
-    let char_data: LoadCharacterClass = serde_json::from_str(character_text)
+    let char_data: LoadCharacterClass = serde_json::from_slice(&character_bytes)
         .map_err(|_| pyo3::exceptions::PyValueError::new_err("Your image file does not contain correct json data"))?;
 
     Ok(CharacterClass {
@@ -763,21 +666,56 @@ fn load_character_card_file(path: &str) -> PyResult<CharacterClass> {
         scenario: char_data.world_scenario.or(char_data.scenario).unwrap_or_default(),
         greeting_message: char_data.char_greeting.or(char_data.first_mes).unwrap_or_default(),
         example_messages: char_data.example_dialogue.or(char_data.mes_example).unwrap_or_default(),
-        image_path: Some(path.to_string()),
+        image_path,
         created_time: char_data.metadata.and_then(|time_metadata| time_metadata.created),
     })
 }
 
-fn find_chara_chunk(buffer: &[u8]) -> Option<String> {
-    let chara_marker = b"tEXtchara";
-    let iend_marker = b"IEND";
-
-    let start = buffer.windows(chara_marker.len())
-        .position(|window| window == chara_marker)?;
-    let end = buffer.windows(iend_marker.len())
-        .rposition(|window| window == iend_marker)?;
+const CHARA_CHUNK_MISSING: &str = r#"Failed to find 'chara' metadata (tEXt chunk) in the PNG file. This may occur due to:
+            1. The file is not a valid character card (Tavern Card V1 format).
+            2. The file may be corrupted or incomplete.
+            3. The character data might be stored in a different format.
+            
+            Please ensure that:
+            - You are using a file created by a compatible character creation tool.
+            - The file hasn't been modified or damaged.
+            - You are using the correct file format for your character data.
+            
+            If the problem persists, try re-exporting the character from its original creation tool."#;
+
+/// Returns the text of the first `tEXt` chunk with the given keyword.
+/// Only chunk headers are read; every other chunk (including the image data)
+/// is skipped by its length, so nothing is decompressed or decoded, and text
+/// chunks placed after the image data are found too.
+fn find_text_chunk<'a>(bytes: &'a [u8], keyword: &[u8]) -> Option<&'a [u8]> {
+    const PNG_SIGNATURE: &[u8] = b"\x89PNG\r\n\x1a\n";
+    if !bytes.starts_with(PNG_SIGNATURE) {
+        return None;
+    }
 
-    Some(String::from_utf8_lossy(&buffer[start + chara_marker.len() + 1..end - 8]).into_owned())
+    let mut offset = PNG_SIGNATURE.len();
+    // Each chunk is a 4-byte length, a 4-byte type, the data, then a 4-byte CRC.
+    while offset + 8 <= bytes.len() {
+        let length = u32::from_be_bytes(bytes[offset..offset + 4].try_into().ok()?) as usize;
+        let chunk_type = &bytes[offset + 4..offset + 8];
+        let data_start = offset + 8;
+        let data_end = data_start.checked_add(length).filter(|&end| end <= bytes.len())?;
+
+        match chunk_type {
+            b"tEXt" => {
+                let data = &bytes[data_start..data_end];
+                if let Some(separator) = data.iter().position(|&b| b == 0) {
+                    if &data[..separator] == keyword {
+                        return Some(&data[separator + 1..]);
+                    }
+                }
+            }
+            b"IEND" => break,
+            _ => {}
+        }
+        offset = data_end + 4;
+    }
+    None
 }
 
 #[pyfunction]
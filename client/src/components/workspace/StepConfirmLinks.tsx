@@ -84,9 +84,14 @@ export function StepConfirmLinks({ project }: StepProps) {
     () => newlyFoundUrls.filter((url) => url.toLowerCase().includes(filterText.toLowerCase())),
     [newlyFoundUrls, filterText]
   );
+  // The server sends existing links unordered; only sort them once they are shown.
+  const sortedExistingUrls = useMemo(
+    () => (showExisting ? [...existingUrlsFoundAgain].sort() : []),
+    [existingUrlsFoundAgain, showExisting]
+  );
   const filteredExistingUrls = useMemo(
-    () => existingUrlsFoundAgain.filter((url) => url.toLowerCase().includes(filterText.toLowerCase())),
-    [existingUrlsFoundAgain, filterText]
+    () => sortedExistingUrls.filter((url) => url.toLowerCase().includes(filterText.toLowerCase())),
+    [sortedExistingUrls, filterText]
   );
 
   const visibleUrls = showExisting ? [...filteredNewUrls, ...filteredExistingUrls] : filteredNewUrls;
@@ -23,6 +23,7 @@ from db.background_jobs import (
     get_background_job as db_get_background_job,
     get_latest_job_by_task_name as db_get_latest_job_by_task_name,
     list_background_jobs_paginated as db_list_background_jobs_paginated,
+    notify_job_cancellation as db_notify_job_cancellation,
     update_background_job as db_update_background_job,
 )
 from db.common import PaginatedResponse, SingleResponse
@@ -121,6 +122,7 @@ class BackgroundJobController(Controller):
                 updated_job = await db_update_background_job(
                     job_id, UpdateBackgroundJob(status=JobStatus.cancelling), tx=tx
                 )
+                await db_notify_job_cancellation(job_id, tx=tx)
             else:  # pending
                 updated_job = await db_update_background_job(
                     job_id, UpdateBackgroundJob(status=JobStatus.canceled), tx=tx
@@ -48,6 +48,12 @@ class TestSchemaPayload(BaseModel):
     status: bool
 
 
+# The schema never changes, so it is built once instead of on every test call.
+TEST_RESPONSE_SCHEMA = ResponseSchema(
+    name="test_schema", schema_value=TestSchemaPayload.model_json_schema()
+)
+
+
 class ProviderController(Controller):
     path = "/providers"
 
@@ -181,9 +187,7 @@ class ProviderController(Controller):
                 )
             ],
             temperature=1,
-            response_format=ResponseSchema(
-                name="test_schema", schema_value=TestSchemaPayload.model_json_schema()
-            ),
+            response_format=TEST_RESPONSE_SCHEMA,
             json_mode=data.json_mode,
         )
 
@@ -5,8 +5,6 @@ from litestar.params import Body
 from pydantic import BaseModel
 from typing import List, Optional
 from urllib.parse import urljoin
-from bs4 import BeautifulSoup
-from soupsieve.util import SelectorSyntaxError
 import httpx
 
 from db.sources import (
@@ -26,6 +24,7 @@ from db.source_hierarchy import (
 )
 from db.common import SingleResponse
 from services.scraper import Scraper
+from services.link_selectors import ParsedPage, selector_error
 from logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -91,37 +90,32 @@ class SourceController(Controller):
     ) -> TestSelectorsResult:
         """Tests CSS selectors against a URL and returns the extracted links."""
         logger.debug(f"Testing selectors for URL: {data.url}")
-        scraper = Scraper()
         content_links = set()
         pagination_link = None
         error_message = None
 
         try:
-            html = await scraper.get_content(data.url, clean=True, pretty=True)
-            soup = BeautifulSoup(html, "html.parser")
+            async with Scraper() as scraper:
+                html = await scraper.get_content(data.url, clean=True)
+            page = ParsedPage(html)
 
             # Test content selectors
             for selector in data.content_selectors:
                 if not selector:
                     continue
-                try:
-                    for link_tag in soup.select(selector):
-                        if href := link_tag.get("href"):
-                            absolute_url = urljoin(data.url, href)  # pyright: ignore[reportArgumentType]
-                            content_links.add(absolute_url)
-                except SelectorSyntaxError as e:
-                    raise ValueError(f"Invalid content selector '{selector}': {e}")
+                if error := selector_error(selector):
+                    raise ValueError(f"Invalid content selector '{selector}': {error}")
+                for href in page.hrefs(selector):
+                    content_links.add(urljoin(data.url, href))
 
             # Test pagination selector
             if data.pagination_selector:
-                try:
-                    next_page_tag = soup.select_one(data.pagination_selector)
-                    if next_page_tag and next_page_tag.get("href"):
-                        pagination_link = urljoin(data.url, next_page_tag.get("href"))  # pyright: ignore[reportArgumentType]
-                except SelectorSyntaxError as e:
+                if error := selector_error(data.pagination_selector):
                     raise ValueError(
-                        f"Invalid pagination selector '{data.pagination_selector}': {e}"
+                        f"Invalid pagination selector '{data.pagination_selector}': {error}"
                     )
+                if next_href := page.first_href(data.pagination_selector):
+                    pagination_link = urljoin(data.url, next_href)
 
         except (httpx.HTTPStatusError, httpx.RequestError) as e:
             error_message = f"Failed to fetch URL: {e}"
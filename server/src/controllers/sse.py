@@ -65,6 +65,13 @@ class SSEController(Controller):
 
         return ServerSentEvent(event_generator())
 
+    @staticmethod
+    def has_subscribers(project_id: str) -> bool:
+        """
+        Whether any client is currently subscribed to a project's events.
+        """
+        return bool(sse_clients.get(project_id))
+
     @staticmethod
     async def send_event_to_project(project_id: str, event_type: str, data: dict):
         """
@@ -1,9 +1,10 @@
 import json
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 from uuid import UUID, uuid4
 
 from db.connection import get_db_connection
+from db.database import AsyncDBTransaction
 from db.common import PaginatedResponse, PaginationMeta
 from pydantic import BaseModel, Field
 
@@ -64,6 +65,45 @@ async def create_api_request_log(log: CreateApiRequestLog) -> ApiRequestLog:
     return ApiRequestLog(**result)
 
 
+async def create_api_request_logs(
+    logs: List[CreateApiRequestLog], tx: Optional[AsyncDBTransaction] = None
+) -> List[ApiRequestLog]:
+    """Create multiple API request logs with a single INSERT."""
+    if not logs:
+        return []
+    db = tx or await get_db_connection()
+    row_placeholders = "(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"
+    query = f"""
+        INSERT INTO "ApiRequestLog" (
+            id, project_id, job_id, api_provider, model_used, request,
+            response, input_tokens, output_tokens, calculated_cost, latency_ms, error, timestamp
+        )
+        VALUES {", ".join([row_placeholders] * len(logs))}
+        RETURNING *
+    """
+    params = []
+    for log in logs:
+        params.extend(
+            (
+                uuid4(),
+                log.project_id,
+                log.job_id,
+                log.api_provider,
+                log.model_used,
+                json.dumps(log.request),
+                json.dumps(log.response) if log.response else None,
+                log.input_tokens,
+                log.output_tokens,
+                log.calculated_cost,
+                log.latency_ms,
+                log.error,
+                log.timestamp,
+            )
+        )
+    results = await db.fetch_all(query, tuple(params))
+    return [ApiRequestLog(**row) for row in results] if results else []
+
+
 async def get_api_request_log(log_id: UUID) -> ApiRequestLog | None:
     """Retrieve an API request log by its ID."""
     db = await get_db_connection()
@@ -1,7 +1,7 @@
 from datetime import datetime
 from enum import Enum
 import json
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Mapping, Optional, Union
 from uuid import UUID, uuid4
 
 from db.connection import get_db_connection
@@ -34,6 +34,10 @@ class TaskName(str, Enum):
     REGENERATE_CHARACTER_FIELD = "regenerate_character_field"
 
 
+# Postgres NOTIFY channel used to tell running jobs they have been cancelled.
+# The payload is the job ID.
+JOB_CANCEL_CHANNEL = "job_cancel"
+
 PARALLEL_LIMITS = {
     TaskName.DISCOVER_AND_CRAWL_SOURCES: 1,
     TaskName.CONFIRM_LINKS: 1,
@@ -290,26 +294,24 @@ async def count_background_jobs() -> int:
     return result["count"] if result and "count" in result else 0
 
 
-async def count_in_progress_background_jobs_by_task_name(task_name: TaskName) -> int:
-    """Count the number of 'in_progress' jobs for a specific task name."""
-    db = await get_db_connection()
-    query = """
-        SELECT COUNT(*) as count
-        FROM "BackgroundJob"
-        WHERE task_name = %s AND status = 'in_progress'
-    """
-    result = await db.fetch_one(query, (task_name.value,))
-    return result["count"] if result and "count" in result else 0
-
-
-async def get_and_lock_pending_background_job() -> BackgroundJob | None:
+async def get_and_lock_pending_background_jobs(
+    free_slots: Mapping[TaskName, int],
+) -> List[BackgroundJob]:
     """
-    Atomically retrieve the oldest pending job and set its status to 'in_progress'.
+    Atomically claim pending jobs and set their status to 'in_progress', taking
+    the oldest jobs of each task type up to its number of `free_slots`.
     This uses the underlying database's locking mechanism to prevent race conditions.
+    Task types missing from `free_slots` are left pending.
     """
+    if not free_slots:
+        return []
     db = await get_db_connection()
-    result = await db.get_and_lock_pending_background_job()
-    return _deserialize_job(result) if result else None
+    results = await db.get_and_lock_pending_background_jobs(
+        {task_name.value: slots for task_name, slots in free_slots.items()}
+    )
+    jobs = [_deserialize_job(row) for row in results]
+    jobs.sort(key=lambda job: job.created_at)
+    return jobs
 
 
 async def update_background_job(
@@ -346,6 +348,18 @@ async def update_background_job(
     return _deserialize_job(result)
 
 
+async def notify_job_cancellation(
+    job_id: UUID, tx: Optional[AsyncDBTransaction] = None
+) -> None:
+    """
+    Notifies listeners that a job has been asked to cancel.
+    When sent inside a transaction, the notification is delivered on commit.
+    """
+    db = tx or await get_db_connection()
+    query = "SELECT pg_notify(%s, %s)"
+    await db.execute(query, (JOB_CANCEL_CHANNEL, job_id))
+
+
 async def delete_background_job(job_id: UUID) -> None:
     """Delete a background job from the database."""
     db = await get_db_connection()
@@ -1,10 +1,10 @@
-import json
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 from uuid import UUID, uuid4
 
 from db.connection import get_db_connection
 from db.database import AsyncDBTransaction
+from db.projects import invalidate_project_cache
 from pydantic import BaseModel, Field
 from services.encryption import decrypt, encrypt
 from logging_config import get_logger
@@ -114,9 +114,7 @@ async def get_credential_with_values(
     if not result:
         return None
 
-    decrypted_values_str = decrypt(result["values"])
-    decrypted_values = json.loads(decrypted_values_str)
-    result["values"] = CredentialValues(**decrypted_values)
+    result["values"] = CredentialValues.model_validate_json(decrypt(result["values"]))
     return result
 
 
@@ -183,3 +181,5 @@ async def delete_credential(
     db = tx or await get_db_connection()
     query = 'DELETE FROM "Credential" WHERE id = %s'
     await db.execute(query, (credential_id,))
+    # Projects using this credential have just had credential_id set to NULL.
+    invalidate_project_cache(tx=tx)
@@ -2,7 +2,16 @@ from enum import Enum
 import json
 from uuid import UUID
 from datetime import datetime
-from typing import Optional, Any, List, Dict, AsyncGenerator
+from typing import (
+    Optional,
+    Any,
+    List,
+    Dict,
+    AsyncGenerator,
+    AsyncIterator,
+    Callable,
+    Mapping,
+)
 from abc import ABC, abstractmethod
 from psycopg import AsyncConnection, sql
 from psycopg.rows import dict_row
@@ -49,6 +58,11 @@ class AsyncDBTransaction(ABC):
     ) -> Optional[Dict[str, Any]]:
         pass
 
+    @abstractmethod
+    def call_after_commit(self, callback: Callable[[], None]) -> None:
+        """Runs the callback once the transaction has committed; dropped on rollback."""
+        pass
+
 
 
 class AsyncDB(ABC):
@@ -90,7 +104,10 @@ class AsyncDB(ABC):
         pass
 
     @abstractmethod
-    async def get_and_lock_pending_background_job(self) -> Optional[Dict[str, Any]]:
+    async def get_and_lock_pending_background_jobs(
+        self, free_slots: Mapping[str, int]
+    ) -> List[Dict[str, Any]]:
+        """Claims the oldest pending jobs, at most `free_slots[task_name]` of each task."""
         pass
 
     @abstractmethod
@@ -102,6 +119,11 @@ class AsyncDB(ABC):
     def transaction(self) -> AbstractAsyncContextManager[AsyncDBTransaction]:
         pass
 
+    @abstractmethod
+    def listen(self, channel: str) -> AbstractAsyncContextManager[AsyncIterator[str]]:
+        """Subscribes to a notification channel and yields an iterator of payloads."""
+        pass
+
 
 
 class PostgresDB(AsyncDB):
@@ -184,9 +206,31 @@ class PostgresDB(AsyncDB):
     ) -> Optional[Dict[str, Any]]:
         return await self.fetch_one(query, params)
 
-    async def get_and_lock_pending_background_job(self) -> Optional[Dict[str, Any]]:
-        query = "WITH oldest_pending AS (SELECT id FROM \"BackgroundJob\" WHERE status = 'pending' ORDER BY created_at LIMIT 1 FOR UPDATE SKIP LOCKED) UPDATE \"BackgroundJob\" SET status = 'in_progress', updated_at = NOW() WHERE id = (SELECT id FROM oldest_pending) RETURNING *;"
-        return await self.fetch_one(query)
+    async def get_and_lock_pending_background_jobs(
+        self, free_slots: Mapping[str, int]
+    ) -> List[Dict[str, Any]]:
+        # Window functions can't be combined with FOR UPDATE, so the pending
+        # rows are locked first and ranked per task afterwards.
+        query = """
+            WITH pending AS (
+                SELECT id, task_name, created_at FROM "BackgroundJob"
+                WHERE status = 'pending' AND task_name = ANY(%s::text[])
+                FOR UPDATE SKIP LOCKED
+            ), ranked AS (
+                SELECT pending.id, slots.free,
+                    row_number() OVER (PARTITION BY pending.task_name ORDER BY pending.created_at) AS position
+                FROM pending
+                JOIN unnest(%s::text[], %s::int[]) AS slots(task_name, free)
+                    ON slots.task_name = pending.task_name
+            )
+            UPDATE "BackgroundJob" SET status = 'in_progress', updated_at = NOW()
+            WHERE id IN (SELECT id FROM ranked WHERE position <= free)
+            RETURNING *;
+        """
+        task_names = list(free_slots)
+        return await self.fetch_all(
+            query, (task_names, task_names, list(free_slots.values()))
+        )
 
     async def table_exists(self, table_name: str) -> bool:
         """Checks if a table exists in the database."""
@@ -201,6 +245,17 @@ class PostgresDB(AsyncDB):
         result = await self.fetch_one(query, (table_name,))
         return result["exists"] if result else False
 
+    @asynccontextmanager
+    async def listen(self, channel: str) -> AsyncGenerator[AsyncIterator[str], None]:
+        # LISTEN needs a dedicated autocommit connection that stays open for the
+        # lifetime of the subscription, so it is not borrowed from the pool.
+        conn = await AsyncConnection.connect(self._dsn, autocommit=True)
+        try:
+            await conn.execute(sql.SQL("LISTEN {}").format(sql.Identifier(channel)))
+            yield (notify.payload async for notify in conn.notifies())
+        finally:
+            await conn.close()
+
     @asynccontextmanager
     async def transaction(self) -> AsyncGenerator[AsyncDBTransaction, None]:
         if not self._pool:
@@ -214,6 +269,7 @@ class PostgresDB(AsyncDB):
                     def __init__(self, conn: AsyncConnection, db: PostgresDB):
                         self._conn = conn
                         self._db = db
+                        self._after_commit: List[Callable[[], None]] = []
 
                     def database_type(self) -> DatabaseType:
                         return self._db.database_type()
@@ -257,6 +313,13 @@ class PostgresDB(AsyncDB):
                     ) -> Optional[Dict[str, Any]]:
                         return await self.fetch_one(query, params)
 
-                yield PsycopgTransactionWrapper(conn, self)
+                    def call_after_commit(self, callback: Callable[[], None]) -> None:
+                        self._after_commit.append(callback)
+
+                tx = PsycopgTransactionWrapper(conn, self)
+                yield tx
+            # Only reached once the transaction has committed.
+            for callback in tx._after_commit:
+                callback()
 
 
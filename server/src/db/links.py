@@ -1,6 +1,6 @@
 from datetime import datetime
 from enum import Enum
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 from uuid import UUID, uuid4
 
 from db.connection import get_db_connection
@@ -103,6 +103,31 @@ async def get_all_link_urls_for_project(
     return [row["url"] for row in results] if results else []
 
 
+async def diff_links_by_urls(
+    project_id: str, urls: Iterable[str], tx: Optional[AsyncDBTransaction] = None
+) -> Tuple[List[str], List[str]]:
+    """
+    Splits the given URLs into those not yet saved as links for the project and
+    those that already are, in a single query.
+    """
+    urls = list(urls)
+    if not urls:
+        return [], []
+    db = tx or await get_db_connection()
+    query = """
+        SELECT u.url, EXISTS (
+            SELECT 1 FROM "Link" WHERE project_id = %s AND "Link".url = u.url
+        ) AS existing
+        FROM unnest(%s::text[]) AS u(url)
+    """
+    results = await db.fetch_all(query, (project_id, urls))
+    new_urls: List[str] = []
+    existing_urls: List[str] = []
+    for row in results or []:
+        (existing_urls if row["existing"] else new_urls).append(row["url"])
+    return new_urls, existing_urls
+
+
 async def count_links_by_project(project_id: str) -> int:
     """Count all links for a given project."""
     db = await get_db_connection()
@@ -157,7 +182,7 @@ async def update_link(
     db = tx or await get_db_connection()
     update_data = link_update.model_dump(exclude_unset=True)
     if not update_data:
-        return await get_link(link_id)
+        return await get_link(link_id, tx=tx)
 
     set_clause_parts = []
     params = []
@@ -165,15 +190,69 @@ async def update_link(
         set_clause_parts.append(f'"{key}" = %s')
         params.append(value)
 
-    if not set_clause_parts:
-        return await get_link(link_id, tx=tx)
-
     params.append(link_id)
     set_clause = ", ".join(set_clause_parts)
-    query = f'UPDATE "Link" SET {set_clause} WHERE id = %s'
+    query = f'UPDATE "Link" SET {set_clause} WHERE id = %s RETURNING *'
+
+    result = await db.execute_and_fetch_one(query, tuple(params))
+    return Link(**result) if result else None
+
+
+# Casts for VALUES lists, where parameters would otherwise be typed as text.
+_LINK_COLUMN_CASTS = {"lorebook_entry_id": "::uuid"}
+
 
-    await db.execute(query, tuple(params))
-    return await get_link(link_id, tx=tx)
+async def update_links_bulk(
+    updates: List[Tuple[UUID, UpdateLink]], tx: Optional[AsyncDBTransaction] = None
+) -> List[Link]:
+    """
+    Applies several link updates and returns the updated links.
+    Updates that set the same fields share a single UPDATE ... FROM (VALUES ...).
+    """
+    db = tx or await get_db_connection()
+    groups: Dict[Tuple[str, ...], List[Tuple[UUID, Dict]]] = {}
+    for link_id, link_update in updates:
+        update_data = link_update.model_dump(exclude_unset=True)
+        if update_data:
+            groups.setdefault(tuple(update_data), []).append((link_id, update_data))
+
+    updated_links: List[Link] = []
+    for keys, rows in groups.items():
+        set_clause = ", ".join(f'"{key}" = t."{key}"' for key in keys)
+        row_placeholder = ", ".join(
+            ["%s::uuid"] + [f"%s{_LINK_COLUMN_CASTS.get(key, '')}" for key in keys]
+        )
+        values = ", ".join([f"({row_placeholder})"] * len(rows))
+        columns = ", ".join(["id"] + [f'"{key}"' for key in keys])
+        query = f"""
+            UPDATE "Link" SET {set_clause}
+            FROM (VALUES {values}) AS t({columns})
+            WHERE "Link".id = t.id
+            RETURNING "Link".*
+        """
+        params = []
+        for link_id, update_data in rows:
+            params.append(link_id)
+            params.extend(update_data[key] for key in keys)
+        results = await db.fetch_all(query, tuple(params))
+        updated_links.extend(Link(**row) for row in results)
+    return updated_links
+
+
+async def bulk_mark_links_processing(
+    link_ids: List[UUID], tx: Optional[AsyncDBTransaction] = None
+) -> List[Link]:
+    """Marks multiple links as processing in one statement and returns them."""
+    if not link_ids:
+        return []
+    db = tx or await get_db_connection()
+    query = """
+        UPDATE "Link" SET status = 'processing'
+        WHERE id = ANY(%s)
+        RETURNING *
+    """
+    results = await db.fetch_all(query, (list(link_ids),))
+    return [Link(**row) for row in results] if results else []
 
 
 async def reset_processing_links_to_pending(
@@ -59,6 +59,38 @@ async def create_lorebook_entry(
     return LorebookEntry(**result)
 
 
+async def create_lorebook_entries(
+    entries: List[CreateLorebookEntry], tx: Optional[AsyncDBTransaction] = None
+) -> List[LorebookEntry]:
+    """Create multiple lorebook entries with a single INSERT, returned in input order."""
+    if not entries:
+        return []
+    db = tx or await get_db_connection()
+    entry_ids = [uuid4() for _ in entries]
+    query = f"""
+        INSERT INTO "LorebookEntry" (id, project_id, title, content, keywords, source_url)
+        VALUES {", ".join(["(%s, %s, %s, %s, %s, %s)"] * len(entries))}
+        RETURNING *
+    """
+    params = []
+    for entry_id, entry in zip(entry_ids, entries):
+        params.extend(
+            (
+                entry_id,
+                entry.project_id,
+                entry.title,
+                entry.content,
+                json.dumps(entry.keywords),
+                entry.source_url,
+            )
+        )
+    results = await db.fetch_all(query, tuple(params))
+    rows_by_id = {row["id"]: row for row in results}
+    if len(rows_by_id) != len(entries):
+        raise Exception("Failed to create lorebook entries")
+    return [LorebookEntry(**rows_by_id[entry_id]) for entry_id in entry_ids]
+
+
 async def get_lorebook_entry(entry_id: UUID) -> LorebookEntry | None:
     """Retrieve a lorebook entry by its ID."""
     db = await get_db_connection()
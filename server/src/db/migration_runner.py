@@ -77,13 +77,11 @@ async def apply_migrations(db: AsyncDB):
         with open(path, "r") as f:
             script = f.read()
 
-        # 1. Apply schema migration (manually splitting script and executing outside transaction)
-        # DDL statements often cause implicit commits, so we execute them separately.
-        statements = [s.strip() for s in script.split(';') if s.strip()]
-        for i, statement in enumerate(statements):
-            logger.debug(f"Executing DDL statement {i+1}/{len(statements)} for {name}: {statement[:80]}...")
-            await db.execute(statement)
-            logger.debug(f"DDL statement {i+1}/{len(statements)} executed successfully.")
+        # 1. Apply schema migration. The whole script is sent in one round trip;
+        # without parameters psycopg uses the simple query protocol, which runs
+        # the statements in order as a single implicit transaction.
+        logger.debug(f"Executing schema script for {name}...")
+        await db.execute(script)
 
         # 2. Run data migration and record version within a transaction for atomicity
         async with db.transaction() as tx:
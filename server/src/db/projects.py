@@ -1,6 +1,7 @@
 from enum import Enum
 import json
-from typing import Any, Dict, Optional, List
+import time
+from typing import Any, Dict, Optional, List, Tuple
 from uuid import UUID
 
 from pydantic import BaseModel, Field, field_serializer
@@ -165,6 +166,54 @@ async def get_project(
     return _deserialize_project(result)
 
 
+# Short-lived cache for the worker, which loads a job's project for every
+# job it runs. Entries are dropped whenever the project is written through
+# this module; the TTL bounds staleness from anything else (e.g. a credential
+# being deleted and the FK nulling credential_id).
+PROJECT_CACHE_TTL = 10
+_project_cache: Dict[str, Tuple[float, Project]] = {}
+# Bumped on every invalidation, so a load that started before a write
+# committed doesn't put the old row back into the cache.
+_project_cache_generation = 0
+
+
+def invalidate_project_cache(
+    project_id: Optional[str] = None, tx: Optional[AsyncDBTransaction] = None
+) -> None:
+    """
+    Drops one project from the cache, or all of them if no ID is given.
+    With a transaction, this happens once it has committed, so the old row
+    can't be loaded and cached again in between.
+    """
+    if tx:
+        tx.call_after_commit(lambda: invalidate_project_cache(project_id))
+        return
+
+    global _project_cache_generation
+    _project_cache_generation += 1
+    if project_id is None:
+        _project_cache.clear()
+    else:
+        _project_cache.pop(str(project_id), None)
+
+
+async def get_project_cached(project_id: str) -> Project | None:
+    """
+    Like get_project, but reuses a recently loaded row. Callers must treat the
+    returned project as read-only, since it is shared.
+    """
+    key = str(project_id)
+    cached = _project_cache.get(key)
+    if cached and time.monotonic() - cached[0] < PROJECT_CACHE_TTL:
+        return cached[1]
+
+    generation = _project_cache_generation
+    project = await get_project(key)
+    if project and generation == _project_cache_generation:
+        _project_cache[key] = (time.monotonic(), project)
+    return project
+
+
 async def count_projects() -> int:
     """Count all projects."""
     db = await get_db_connection()
@@ -227,6 +276,7 @@ async def update_project(
     query = f'UPDATE "Project" SET {set_clause} WHERE id = %s RETURNING *'
 
     result = await db.execute_and_fetch_one(query, tuple(params))
+    invalidate_project_cache(project_id, tx=tx)
     return _deserialize_project(result)
 
 
@@ -235,3 +285,4 @@ async def delete_project(project_id: str):
     db = await get_db_connection()
     query = 'DELETE FROM "Project" WHERE id = %s'
     await db.execute(query, (project_id,))
+    invalidate_project_cache(project_id)
@@ -1,4 +1,5 @@
 import json
+import logging
 import time
 from typing import Any, Dict, List, Literal, Optional, Union
 from uuid import uuid4
@@ -122,9 +123,10 @@ class DeepSeekProvider(BaseProvider):
         request_body = DeepSeekRequestBody.from_common_request(request)
         payload = request_body.model_dump(exclude_none=True, by_alias=True)
 
-        logger.debug("--- Sending DeepSeek Payload (Native) ---")
-        logger.debug(json.dumps(payload, indent=2))
-        logger.debug("-----------------------------------------")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("--- Sending DeepSeek Payload (Native) ---")
+            logger.debug(json.dumps(payload, indent=2))
+            logger.debug("-----------------------------------------")
 
         start_time = time.time()
         try:
@@ -210,9 +212,10 @@ class DeepSeekProvider(BaseProvider):
             temperature=request.temperature,
         ).model_dump(exclude_none=True, by_alias=True)
 
-        logger.debug("--- Sending DeepSeek Payload (Prompt-Engineered JSON) ---")
-        logger.debug(json.dumps(payload, indent=2))
-        logger.debug("---------------------------------------------------------")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("--- Sending DeepSeek Payload (Prompt-Engineered JSON) ---")
+            logger.debug(json.dumps(payload, indent=2))
+            logger.debug("---------------------------------------------------------")
 
         content_text = ""
         raw_response = {}
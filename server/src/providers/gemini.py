@@ -1,4 +1,5 @@
 import json
+import logging
 import time
 from typing import Dict, List, Literal, Optional, Union
 from uuid import uuid4
@@ -293,9 +294,10 @@ class GeminiClient(BaseProvider):
 
         payload = gemini_request.model_dump(exclude_none=True, by_alias=True)
 
-        logger.debug("--- Sending Gemini Payload ---")
-        logger.debug(json.dumps(payload, indent=2))
-        logger.debug("------------------------------")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("--- Sending Gemini Payload ---")
+            logger.debug(json.dumps(payload, indent=2))
+            logger.debug("------------------------------")
 
         start_time = time.time()
         try:
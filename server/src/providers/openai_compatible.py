@@ -1,4 +1,5 @@
 import json
+import logging
 import time
 from typing import Any, Dict, List, Literal, Optional, Union
 
@@ -138,9 +139,10 @@ class OpenAICompatibleClient(BaseProvider):
         request_body = OpenAICompatibleRequestBody.from_common_request(request)
         payload = request_body.model_dump(exclude_none=True, by_alias=True)
 
-        logger.debug("--- Sending OpenAI Compatible Payload ---")
-        logger.debug(json.dumps(payload, indent=2))
-        logger.debug("-----------------------------------------")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("--- Sending OpenAI Compatible Payload ---")
+            logger.debug(json.dumps(payload, indent=2))
+            logger.debug("-----------------------------------------")
 
         start_time = time.time()
         try:
@@ -1,4 +1,5 @@
 import json
+import logging
 import time
 from typing import Any, Dict, List, Literal, Optional, Union
 
@@ -193,9 +194,10 @@ class OpenRouterClient(BaseProvider):
         # Dump the model to a dict, excluding None values and using field aliases
         payload = request_body.model_dump(exclude_none=True, by_alias=True)
 
-        logger.debug("--- Sending Payload ---")
-        logger.debug(json.dumps(payload, indent=2))
-        logger.debug("-----------------------")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("--- Sending Payload ---")
+            logger.debug(json.dumps(payload, indent=2))
+            logger.debug("-----------------------")
 
         start_time = time.time()
         try:
@@ -1,16 +1,28 @@
 import asyncio
 import re
+import time
+from functools import lru_cache
 from uuid import UUID
 from datetime import datetime
-from typing import Optional, Union, List, Dict, Set
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Optional,
+    Union,
+    List,
+    Dict,
+    Set,
+    Tuple,
+    Type,
+)
+import httpx
 from pydantic import BaseModel
-from urllib.parse import urljoin
-from bs4 import BeautifulSoup
-from collections import deque
+from urllib.parse import SplitResult, parse_qsl, urlencode, urljoin, urlsplit
 
-from soupsieve import SelectorSyntaxError
 
 from db.background_jobs import (
+    JOB_CANCEL_CHANNEL,
     BackgroundJob,
     ConfirmLinksPayload,
     ConfirmLinksResult,
@@ -20,6 +32,7 @@ from db.background_jobs import (
     FetchSourceContentResult,
     GenerateCharacterCardPayload,
     GenerateCharacterCardResult,
+    GenerateSearchParamsPayload,
     GenerateSearchParamsResult,
     JobStatus,
     ProcessProjectEntriesPayload,
@@ -38,14 +51,14 @@ from db.links import (
     Link,
     LinkStatus,
     UpdateLink,
+    bulk_mark_links_processing,
     create_links,
-    get_all_link_urls_for_project,
-    get_link,
+    diff_links_by_urls,
     get_links_by_ids,
     get_processable_links_for_project,
-    update_link,
+    update_links_bulk,
 )
-from db.lorebook_entries import CreateLorebookEntry, create_lorebook_entry
+from db.lorebook_entries import CreateLorebookEntry, create_lorebook_entries
 from db.character_cards import (
     CreateCharacterCard,
     UpdateCharacterCard,
@@ -60,7 +73,7 @@ from db.projects import (
     ProjectType,
     SearchParams,
     UpdateProject,
-    get_project,
+    get_project_cached,
     update_project,
 )
 from db.sources import (
@@ -101,23 +114,44 @@ from services.rate_limiter import (
     update_job_with_notification,
     wait_for_rate_limit,
 )
-from db.api_request_logs import create_api_request_log, CreateApiRequestLog
+from db.api_request_logs import (
+    create_api_request_log,
+    create_api_request_logs,
+    CreateApiRequestLog,
+)
 from services.scraper import Scraper
+from services.link_selectors import ParsedPage, group_selectors, selector_error
 from services.character_card_parser import (
     fetch_and_parse_character_card,
     CharacterCardParseError,
 )
 from logging_config import get_logger
-from services.templates import create_messages_from_template
+from services.templates import create_messages_from_template, warm_template_cache
 
 logger = get_logger(__name__)
 
 # Process database writes in chunks of this size for better UI feedback.
 DB_WRITE_BATCH_SIZE = 10
+# Sources crawled at the same time by the discover and rescan jobs.
+CONCURRENT_SOURCE_CRAWLS = 4
+# Minimum seconds between job progress updates written after DB batches.
+PROGRESS_FLUSH_INTERVAL = 0.25
+# Seconds between job status checks when cancellation can't be listened for.
+CANCELLATION_POLL_INTERVAL = 5
 
 
 # --- Utility Functions ---
 
+
+@lru_cache(maxsize=None)
+def _response_schema(name: str, model: Type[BaseModel]) -> ResponseSchema:
+    """
+    Builds the structured-output format for an LLM response model once.
+    The JSON schema and its flattening only depend on the model class.
+    """
+    return ResponseSchema(name=name, schema_value=model.model_json_schema())
+
+
 def _is_local_file_path(url: str) -> bool:
     """Checks if a URL string looks like a local file path (file:// or Windows path)."""
     return url.startswith("file://") or (
@@ -149,9 +183,62 @@ LinkProcessingResult = Union[LinkSuccessResult, LinkSkippedResult, LinkFailedRes
 
 
 class CrawlResult(BaseModel):
-    new_links: Set[str] = set()
-    existing_links: Set[str] = set()
     new_sources_created: int = 0
+    # Child sources to crawl next. They are written in the caller's
+    # transaction, so they may only be queued once it has committed.
+    child_source_ids: List[UUID] = []
+
+
+async def _watch_for_cancellation(
+    job: BackgroundJob, cancellation_event: asyncio.Event
+) -> None:
+    """
+    Sets `cancellation_event` as soon as a cancellation notification arrives for the job.
+    Runs until cancelled by the job handler once its work is done.
+    """
+    try:
+        db = await get_db_connection()
+        async with db.listen(JOB_CANCEL_CHANNEL) as notifications:
+            # A cancel may have landed before LISTEN was registered.
+            current_job = await get_background_job(job.id)
+            if current_job and current_job.status == JobStatus.cancelling:
+                cancellation_event.set()
+            else:
+                async for job_id in notifications:
+                    if job_id == str(job.id):
+                        cancellation_event.set()
+                        break
+        if cancellation_event.is_set():
+            logger.info(
+                f"[{job.id}] Cancellation requested for {job.task_name.value} job."
+            )
+    except Exception as e:
+        # LISTEN can be unavailable (e.g. behind a transaction-mode pooler) or the
+        # listening connection can drop mid-job; polling still gets the job cancelled.
+        logger.warning(
+            f"[{job.id}] Failed to listen for job cancellation, polling instead: {e}"
+        )
+        await _poll_for_cancellation(job, cancellation_event)
+
+
+async def _poll_for_cancellation(
+    job: BackgroundJob, cancellation_event: asyncio.Event
+) -> None:
+    """Fallback for _watch_for_cancellation that checks the job status periodically."""
+    while not cancellation_event.is_set():
+        try:
+            current_job = await get_background_job(job.id)
+            if current_job and current_job.status == JobStatus.cancelling:
+                cancellation_event.set()
+                logger.info(
+                    f"[{job.id}] Cancellation requested for {job.task_name.value} job."
+                )
+                return
+        except Exception as e:
+            logger.error(
+                f"[{job.id}] Failed to poll for job cancellation: {e}", exc_info=True
+            )
+        await asyncio.sleep(CANCELLATION_POLL_INTERVAL)
 
 
 async def _get_provider_for_project(project: Project) -> BaseProvider:
@@ -168,18 +255,16 @@ async def _get_provider_for_project(project: Project) -> BaseProvider:
 # --- Character Creator Jobs ---
 
 
-async def fetch_source_content(job: BackgroundJob, project: Project):
+async def fetch_source_content(
+    job: BackgroundJob, project: Project, payload: FetchSourceContentPayload
+):
     """
     Scrapes content from source URLs and caches it in the ProjectSource table.
     """
-    if not isinstance(job.payload, FetchSourceContentPayload):
-        raise TypeError("Invalid payload for fetch_source_content job.")
-
-    source_ids = job.payload.source_ids
+    source_ids = payload.source_ids
     total_sources = len(source_ids)
     processed_count = 0
     failed_count = 0
-    scraper = Scraper()
 
     async with (await get_db_connection()).transaction() as tx:
         await update_job_with_notification(
@@ -190,89 +275,98 @@ async def fetch_source_content(job: BackgroundJob, project: Project):
             tx=tx,
         )
 
-    for source_id in source_ids:
-        try:
-            source = await get_project_source(source_id)
-            if not source:
-                logger.warning(f"[{job.id}] Source {source_id} not found, skipping.")
-                failed_count += 1
-                continue
-
-            # Handle potential misclassification of local file paths as web_url due to migration issues
-            current_source_type = source.source_type
-            if (
-                current_source_type == "web_url"
-                and project.project_type == ProjectType.CHARACTER
-                and _is_local_file_path(source.url)
-            ):
-                logger.warning(
-                    f"[{job.id}] Source {source_id} classified as web_url but URL looks like a local file path. Treating as character_card source."
-                )
-                current_source_type = "character_card"
-
-            if current_source_type == "user_text_file":
-                # Content is already provided in raw_content, just ensure it's present
-                if not source.raw_content:
-                    raise ValueError("User Text File source is missing raw_content.")
-                content = source.raw_content
-                content_type = "markdown"
-            elif current_source_type == "character_card":
-                # Fetch and parse character card content
-                content = await fetch_and_parse_character_card(source.url)
-                content_type = "markdown"
-                logger.debug(f"[{job.id}] Parsed content length: {len(content)}")
-            elif current_source_type == "web_url":
-                # Web scraping logic (default)
-                if not source.url.startswith(("http://", "https://")):
-                    raise ValueError(
-                        f"Web URL source must start with http:// or https://, got: {source.url}"
+    async with Scraper() as scraper, httpx.AsyncClient(
+        follow_redirects=True
+    ) as card_client:
+        for source_id in source_ids:
+            try:
+                source = await get_project_source(source_id)
+                if not source:
+                    logger.warning(
+                        f"[{job.id}] Source {source_id} not found, skipping."
                     )
-
-                if project.project_type == ProjectType.CHARACTER:
-                    content = await scraper.get_content(
-                        source.url, type="markdown", clean=True
+                    failed_count += 1
+                    continue
+
+                # Handle potential misclassification of local file paths as web_url due to migration issues
+                current_source_type = source.source_type
+                if (
+                    current_source_type == "web_url"
+                    and project.project_type == ProjectType.CHARACTER
+                    and _is_local_file_path(source.url)
+                ):
+                    logger.warning(
+                        f"[{job.id}] Source {source_id} classified as web_url but URL looks like a local file path. Treating as character_card source."
                     )
+                    current_source_type = "character_card"
+
+                if current_source_type == "user_text_file":
+                    # Content is already provided in raw_content, just ensure it's present
+                    if not source.raw_content:
+                        raise ValueError(
+                            "User Text File source is missing raw_content."
+                        )
+                    content = source.raw_content
                     content_type = "markdown"
-                else:  # Lorebook
-                    content = await scraper.get_content(
-                        source.url, type="html", clean=True
+                elif current_source_type == "character_card":
+                    # Fetch and parse character card content
+                    content = await fetch_and_parse_character_card(
+                        source.url, client=card_client
                     )
-                    content_type = "html"
-            else:
-                raise ValueError(f"Unsupported source type: {source.source_type}")
-
-            updated_source = await update_project_source(
-                source.id,
-                UpdateProjectSource(
-                    raw_content=content,
-                    content_type=content_type,
-                    content_char_count=len(content),
-                    last_crawled_at=datetime.now(),
-                ),
-            )
-            if updated_source:
-                await send_source_update_notification(project.id, updated_source)
-            processed_count += 1
-        except (Exception, CharacterCardParseError) as e:
-            logger.error(
-                f"[{job.id}] Failed to fetch content for source {source_id}: {e}",
-                exc_info=True,
-            )
-            # Log the content that failed to save, truncated
-            if 'content' in locals():
-                logger.error(f"[{job.id}] Failed content start: {content[:200]}")
-            failed_count += 1
-        finally:
-            progress = ((processed_count + failed_count) / total_sources) * 100
-            async with (await get_db_connection()).transaction() as tx:
-                await update_job_with_notification(
-                    job.id,
-                    UpdateBackgroundJob(
-                        processed_items=processed_count + failed_count,
-                        progress=progress,
+                    content_type = "markdown"
+                    logger.debug(f"[{job.id}] Parsed content length: {len(content)}")
+                elif current_source_type == "web_url":
+                    # Web scraping logic (default)
+                    if not source.url.startswith(("http://", "https://")):
+                        raise ValueError(
+                            f"Web URL source must start with http:// or https://, got: {source.url}"
+                        )
+
+                    if project.project_type == ProjectType.CHARACTER:
+                        content = await scraper.get_content(
+                            source.url, type="markdown", clean=True
+                        )
+                        content_type = "markdown"
+                    else:  # Lorebook
+                        content = await scraper.get_content(
+                            source.url, type="html", clean=True
+                        )
+                        content_type = "html"
+                else:
+                    raise ValueError(f"Unsupported source type: {source.source_type}")
+
+                updated_source = await update_project_source(
+                    source.id,
+                    UpdateProjectSource(
+                        raw_content=content,
+                        content_type=content_type,
+                        content_char_count=len(content),
+                        last_crawled_at=datetime.now(),
                     ),
-                    tx=tx,
                 )
+                if updated_source:
+                    await send_source_update_notification(project.id, updated_source)
+                processed_count += 1
+            except (Exception, CharacterCardParseError) as e:
+                logger.error(
+                    f"[{job.id}] Failed to fetch content for source {source_id}: {e}",
+                    exc_info=True,
+                )
+                # Log the content that failed to save, truncated
+                if "content" in locals():
+                    logger.error(f"[{job.id}] Failed content start: {content[:200]}")
+                failed_count += 1
+            finally:
+                progress = ((processed_count + failed_count) / total_sources) * 100
+                async with (await get_db_connection()).transaction() as tx:
+                    await update_job_with_notification(
+                        job.id,
+                        UpdateBackgroundJob(
+                            processed_items=processed_count + failed_count,
+                            progress=progress,
+                        ),
+                        tx=tx,
+                    )
 
     async with (await get_db_connection()).transaction() as tx:
         await update_job_with_notification(
@@ -287,16 +381,15 @@ async def fetch_source_content(job: BackgroundJob, project: Project):
         )
 
 
-async def generate_character_card(job: BackgroundJob, project: Project):
+async def generate_character_card(
+    job: BackgroundJob, project: Project, payload: GenerateCharacterCardPayload
+):
     """
     Generates a full character card using all fetched content from project sources.
     """
-    if not isinstance(job.payload, GenerateCharacterCardPayload):
-        raise TypeError("Invalid payload for generate_character_card job.")
-
-    if job.payload.source_ids:
+    if payload.source_ids:
         # If specific sources are provided, fetch them directly
-        source_futures = [get_project_source(sid) for sid in job.payload.source_ids]
+        source_futures = [get_project_source(sid) for sid in payload.source_ids]
         sources = await asyncio.gather(*source_futures)
         sources = [s for s in sources if s]  # Filter out any not found
     else:
@@ -331,10 +424,7 @@ async def generate_character_card(job: BackgroundJob, project: Project):
             messages=create_messages_from_template(
                 project.templates.character_generation, context
             ),
-            response_format=ResponseSchema(
-                name="character_card_data",
-                schema_value=CharacterCardData.model_json_schema(),
-            ),
+            response_format=_response_schema("character_card_data", CharacterCardData),
             json_mode=JsonMode.prompt_engineering
             if project.json_enforcement_mode == JsonEnforcementMode.prompt_engineering
             else JsonMode.api_native,
@@ -384,30 +474,29 @@ async def generate_character_card(job: BackgroundJob, project: Project):
         )
 
 
-async def regenerate_character_field(job: BackgroundJob, project: Project):
+async def regenerate_character_field(
+    job: BackgroundJob, project: Project, payload: RegenerateCharacterFieldPayload
+):
     """
     Regenerates a single field of a character card using selective context.
     """
-    if not isinstance(job.payload, RegenerateCharacterFieldPayload):
-        raise TypeError("Invalid payload for regenerate_character_field job.")
-
     # --- 1. Gather Context ---
     existing_card = await get_character_card_by_project(project.id)
     if not existing_card:
         raise ValueError("Cannot regenerate field: Character card not found.")
 
     existing_fields_str = ""
-    if job.payload.context_options.include_existing_fields:
+    if payload.context_options.include_existing_fields:
         card_dict = existing_card.model_dump()
         for key, value in card_dict.items():
-            if key != job.payload.field_to_regenerate and value:
+            if key != payload.field_to_regenerate and value:
                 existing_fields_str += f"{key.upper()}:\n{value}\n\n"
 
     source_material_str = ""
-    if job.payload.context_options.source_ids_to_include:
+    if payload.context_options.source_ids_to_include:
         sources_to_include = [
             await get_project_source(sid)
-            for sid in job.payload.context_options.source_ids_to_include
+            for sid in payload.context_options.source_ids_to_include
         ]
         source_material_str = "\n\n---\n\n".join(
             [s.raw_content for s in sources_to_include if s and s.raw_content]
@@ -419,8 +508,8 @@ async def regenerate_character_field(job: BackgroundJob, project: Project):
     globals_dict = {gt.name: gt.content for gt in global_templates}
     context = {
         "project": project.model_dump(),
-        "field_to_regenerate": job.payload.field_to_regenerate,
-        "custom_prompt": job.payload.custom_prompt,
+        "field_to_regenerate": payload.field_to_regenerate,
+        "custom_prompt": payload.custom_prompt,
         "context": {
             "existing_fields": existing_fields_str,
             "source_material": source_material_str,
@@ -439,9 +528,8 @@ async def regenerate_character_field(job: BackgroundJob, project: Project):
             messages=create_messages_from_template(
                 project.templates.character_field_regeneration, context
             ),
-            response_format=ResponseSchema(
-                name="regenerated_field_response",
-                schema_value=RegeneratedFieldResponse.model_json_schema(),
+            response_format=_response_schema(
+                "regenerated_field_response", RegeneratedFieldResponse
             ),
             json_mode=JsonMode.prompt_engineering,  # Force prompt engineering for this task
             **project.model_parameters,
@@ -473,7 +561,7 @@ async def regenerate_character_field(job: BackgroundJob, project: Project):
 
         field_response = RegeneratedFieldResponse.model_validate(response.content)
         update_payload = UpdateCharacterCard(
-            **{job.payload.field_to_regenerate: field_response.new_content}
+            **{payload.field_to_regenerate: field_response.new_content}
         )
         updated_card = await update_character_card(
             existing_card.id, update_payload, tx=tx
@@ -486,7 +574,7 @@ async def regenerate_character_field(job: BackgroundJob, project: Project):
             UpdateBackgroundJob(
                 status=JobStatus.completed,
                 result=RegenerateCharacterFieldResult(
-                    field_regenerated=job.payload.field_to_regenerate
+                    field_regenerated=payload.field_to_regenerate
                 ),
             ),
             tx=tx,
@@ -496,136 +584,237 @@ async def regenerate_character_field(job: BackgroundJob, project: Project):
 # --- Lorebook Creator Jobs ---
 
 
+@lru_cache(maxsize=1024)
+def _compile_exclusion_regex(pattern: str) -> Optional["re.Pattern[str]"]:
+    """Compiles a /regex/ URL exclusion pattern, or returns None if it is invalid."""
+    try:
+        return re.compile(pattern[1:-1])
+    except re.error:
+        return None
+
+
+def _resolve_href(base: SplitResult, base_url: str, href: str) -> str:
+    """Resolves an href against a page URL, skipping urljoin for the common cases."""
+    if href.startswith(("http://", "https://")):
+        return href
+    # Root-relative paths only need the page's origin. Protocol-relative
+    # links and dot segments still go through urljoin.
+    if href.startswith("/") and not href.startswith("//") and "/." not in href:
+        return f"{base.scheme}://{base.netloc}{href}"
+    # Query-only links (typical for pagination) keep the page's path.
+    if href.startswith("?") and len(href) > 1 and "#" not in href:
+        return f"{base.scheme}://{base.netloc}{base.path}{href}"
+    return urljoin(base_url, href)
+
+
+def _normalize_page_url(url: str) -> str:
+    """Drops the fragment and sorts query params so equivalent page URLs compare equal."""
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return parts._replace(query=query, fragment="").geturl()
+
+
+async def _crawl_source_queue(
+    queue: "asyncio.Queue[tuple[UUID, int]]",
+    crawl_source: Callable[[UUID, int], Awaitable[None]],
+    cancellation_event: asyncio.Event,
+) -> None:
+    """
+    Crawls queued sources concurrently until the queue is exhausted, including
+    child sources queued by the crawl itself.
+    """
+
+    async def worker():
+        while True:
+            source_id, current_depth = await queue.get()
+            try:
+                # Sources still queued after a cancellation are drained unprocessed.
+                if not cancellation_event.is_set():
+                    await crawl_source(source_id, current_depth)
+            except Exception as e:
+                logger.error(
+                    f"Unexpected error crawling source {source_id}: {e}", exc_info=True
+                )
+            finally:
+                queue.task_done()
+
+    workers = [
+        asyncio.create_task(worker()) for _ in range(CONCURRENT_SOURCE_CRAWLS)
+    ]
+    try:
+        await queue.join()
+    finally:
+        for task in workers:
+            task.cancel()
+
+
 async def _crawl_and_discover(
     project_id: str,
     source: ProjectSource,
     selectors: SelectorResponse,
-    queue: deque,
     visited_source_urls: Set[str],
+    found_links: Set[str],
     current_depth: int,
     scraper: Scraper,
-    existing_db_links: Set[str],
-    newly_discovered_links_this_job: Set[str],
     tx: AsyncDBTransaction,
 ) -> CrawlResult:
     """
-    Internal helper to perform crawling and discovery for a single source
+    Internal helper to perform crawling and discovery for a single source.
+    Content links are added to the job-wide found_links set as they are found.
     """
     result = CrawlResult()
     pages_crawled = 0
     current_url: Optional[str] = source.url
-    exclusion_patterns = source.url_exclusion_patterns or []
+    # Convention: /regex/ for regex patterns, otherwise plain string matching.
+    # Patterns are resolved once per source rather than for every URL.
+    exclusion_regexes: List["re.Pattern[str]"] = []
+    exclusion_substrings: List[str] = []
+    for pattern in source.url_exclusion_patterns or []:
+        regex = (
+            _compile_exclusion_regex(pattern)
+            if pattern.startswith("/") and pattern.endswith("/")
+            else None
+        )
+        if regex is not None:
+            exclusion_regexes.append(regex)
+        else:
+            # Plain strings, and invalid regexes treated as plain strings for safety
+            exclusion_substrings.append(pattern)
 
     def is_excluded(url: str) -> bool:
-        if not exclusion_patterns:
-            return False
-        for pattern in exclusion_patterns:
-            # Convention: /regex/ for regex patterns, otherwise plain string matching.
-            if pattern.startswith("/") and pattern.endswith("/"):
-                try:
-                    # Strip slashes and perform regex search
-                    if re.search(pattern[1:-1], url):
-                        return True
-                except re.error:
-                    # Invalid regex, treat as a plain string for safety
-                    if pattern in url:
-                        return True
-            else:
-                # Plain string matching
-                if pattern in url:
-                    return True
-        return False
+        return any(substring in url for substring in exclusion_substrings) or any(
+            regex.search(url) for regex in exclusion_regexes
+        )
+
+    def combine_selectors(selector_list: List[str], kind: str) -> List[str]:
+        # Invalid selectors are dropped once per source instead of failing on
+        # every page, and the rest are matched in as few passes as possible.
+        valid_selectors = []
+        for selector in selector_list:
+            error = selector_error(selector)
+            if error is not None:
+                logger.warning(
+                    f"Invalid {kind} CSS selector '{selector}' for source {source.url}. Skipping. Error: {error}"
+                )
+                continue
+            valid_selectors.append(selector)
+        return group_selectors(valid_selectors)
+
+    content_selectors = combine_selectors(selectors.content_selectors, "content")
+    category_selectors = (
+        combine_selectors(selectors.category_selectors, "category")
+        if current_depth < source.max_crawl_depth
+        else []
+    )
 
-    while current_url and pages_crawled < source.max_pages_to_crawl:
+    # Pagination can loop back on itself (e.g. the last page linking to itself
+    # through a canonical URL), so each page is fetched at most once.
+    visited_page_urls: Set[str] = set()
+    # Some sites serve the same listing under different URLs (e.g. any page
+    # number past the last one), which only shows up once the body is fetched.
+    # Pages are compared by the links they yield rather than their markup, so
+    # counters, dates or ads that change between requests don't hide a repeat.
+    seen_page_link_sets: Set[int] = set()
+
+    def fetch_page(url: str) -> "asyncio.Task[str]":
+        visited_page_urls.add(_normalize_page_url(url))
         logger.info(
-            f"[{source.project_id}] Crawling page {pages_crawled + 1} of source {source.id}: {current_url}"
+            f"[{source.project_id}] Crawling page {pages_crawled + 1} of source {source.id}: {url}"
         )
-        try:
-            content = await scraper.get_content(current_url, clean=True, pretty=True)
-            soup = BeautifulSoup(content, "html.parser")
-            pages_crawled += 1
-        except Exception as e:
-            logger.error(
-                f"[{source.project_id}] Failed to crawl page {current_url} for source {source.id}. Halting crawl for this source. Error: {e}"
-            )
-            break  # Stop crawling this source's pages, but don't fail the whole job.
-
-        content_urls = set()
-        for selector in selectors.content_selectors:
+        return asyncio.create_task(scraper.get_content(url, clean=True))
+
+    # The next page is fetched in the background while the current one is
+    # being parsed and its discovered sources are written to the DB.
+    next_page_fetch: Optional["asyncio.Task[str]"] = (
+        fetch_page(current_url)
+        if current_url and source.max_pages_to_crawl > 0
+        else None
+    )
+    try:
+        while current_url and next_page_fetch:
             try:
-                for link_tag in soup.select(selector):
-                    if href := link_tag.get("href"):
-                        absolute_url = urljoin(current_url, href)  # pyright: ignore[reportArgumentType]
-                        if not is_excluded(absolute_url):
-                            content_urls.add(absolute_url)
-            except SelectorSyntaxError as e:
-                logger.warning(
-                    f"Invalid content CSS selector '{selector}' for source {source.url}. Skipping. Error: {e}"
+                content = await next_page_fetch
+                page = ParsedPage(content)
+                pages_crawled += 1
+            except Exception as e:
+                logger.error(
+                    f"[{source.project_id}] Failed to crawl page {current_url} for source {source.id}. Halting crawl for this source. Error: {e}"
                 )
+                break  # Stop crawling this source's pages, but don't fail the whole job.
+
+            base = urlsplit(current_url)
+            next_page_url: Optional[str] = None
+            if selectors.pagination_selector:
+                if next_href := page.first_href(selectors.pagination_selector):
+                    next_page_url = _resolve_href(base, current_url, next_href)
+                    if _normalize_page_url(next_page_url) in visited_page_urls:
+                        next_page_url = None
+            next_page_fetch = (
+                fetch_page(next_page_url)
+                if next_page_url and pages_crawled < source.max_pages_to_crawl
+                else None
+            )
 
-        category_urls = set()
-        if current_depth < source.max_crawl_depth:
-            for selector in selectors.category_selectors:
-                try:
-                    for link_tag in soup.select(selector):
-                        if href := link_tag.get("href"):
-                            absolute_url = urljoin(current_url, href)  # pyright: ignore[reportArgumentType]
-                            if not is_excluded(absolute_url):
-                                category_urls.add(absolute_url)
-                except SelectorSyntaxError as e:
-                    logger.warning(
-                        f"Invalid category CSS selector '{selector}' for source {source.url}. Skipping. Error: {e}"
+            content_urls = set()
+            for selector in content_selectors:
+                for href in page.hrefs(selector):
+                    absolute_url = _resolve_href(base, current_url, href)
+                    if not is_excluded(absolute_url):
+                        content_urls.add(absolute_url)
+
+            category_urls = set()
+            for selector in category_selectors:
+                for href in page.hrefs(selector):
+                    absolute_url = _resolve_href(base, current_url, href)
+                    if not is_excluded(absolute_url):
+                        category_urls.add(absolute_url)
+
+            if content_urls or category_urls:
+                page_link_set = hash(frozenset(content_urls | category_urls))
+                if page_link_set in seen_page_link_sets:
+                    logger.info(
+                        f"[{source.project_id}] Page {current_url} repeats the links of an earlier page of source {source.id}. Stopping pagination."
                     )
+                    break
+                seen_page_link_sets.add(page_link_set)
 
-        content_urls -= (
-            category_urls  # Ensure content links are not also treated as categories
-        )
-        for url in content_urls:
-            if url in existing_db_links:
-                result.existing_links.add(url)
-            elif url not in newly_discovered_links_this_job:
-                result.new_links.add(url)
-
-        if pages_crawled == 1 and current_depth < source.max_crawl_depth:
-            for cat_url in category_urls:
-                if cat_url not in visited_source_urls:
-                    visited_source_urls.add(cat_url)
-                    existing_source = await get_project_source_by_url(
-                        project_id, cat_url, tx=tx
-                    )
+            content_urls -= (
+                category_urls  # Ensure content links are not also treated as categories
+            )
+            found_links.update(content_urls)
+
+            if pages_crawled == 1 and current_depth < source.max_crawl_depth:
+                for cat_url in category_urls:
+                    if cat_url not in visited_source_urls:
+                        visited_source_urls.add(cat_url)
+                        existing_source = await get_project_source_by_url(
+                            project_id, cat_url, tx=tx
+                        )
 
-                    if existing_source:
-                        child_source = existing_source
-                    else:
-                        child_source = await create_project_source(
-                            CreateProjectSource(
-                                project_id=project_id,
-                                url=cat_url,
-                                max_crawl_depth=source.max_crawl_depth,
-                                max_pages_to_crawl=source.max_pages_to_crawl,
-                                url_exclusion_patterns=source.url_exclusion_patterns,
-                            ),
-                            tx=tx,
+                        if existing_source:
+                            child_source = existing_source
+                        else:
+                            child_source = await create_project_source(
+                                CreateProjectSource(
+                                    project_id=project_id,
+                                    url=cat_url,
+                                    max_crawl_depth=source.max_crawl_depth,
+                                    max_pages_to_crawl=source.max_pages_to_crawl,
+                                    url_exclusion_patterns=source.url_exclusion_patterns,
+                                ),
+                                tx=tx,
+                            )
+                            result.new_sources_created += 1
+
+                        await add_source_child_relationship(
+                            project_id, source.id, child_source.id, tx=tx
                         )
-                        result.new_sources_created += 1
+                        result.child_source_ids.append(child_source.id)
 
-                    await add_source_child_relationship(
-                        project_id, source.id, child_source.id, tx=tx
-                    )
-                    queue.append((child_source.id, current_depth + 1))
-
-        if selectors.pagination_selector:
-            next_page_tag = soup.select_one(selectors.pagination_selector)
-            if next_page_tag and next_page_tag.get("href"):
-                next_page_url = urljoin(current_url, next_page_tag.get("href"))  # pyright: ignore[reportArgumentType]
-                if next_page_url == current_url:
-                    current_url = None
-                else:
-                    current_url = next_page_url
-            else:
-                current_url = None
-        else:
-            current_url = None
+            current_url = next_page_url
+    finally:
+        if next_page_fetch and not next_page_fetch.done():
+            next_page_fetch.cancel()
 
     await update_project_source(
         source.id, UpdateProjectSource(last_crawled_at=datetime.now()), tx=tx
@@ -633,116 +822,117 @@ async def _crawl_and_discover(
     return result
 
 
-async def discover_and_crawl_sources(job: BackgroundJob, project: Project):
+async def discover_and_crawl_sources(
+    job: BackgroundJob, project: Project, payload: DiscoverAndCrawlSourcesPayload
+):
     """
     Processes a job to discover sub-sources and find content links, without saving them.
     The found URLs are returned in the job result.
     """
-    if not isinstance(job.payload, DiscoverAndCrawlSourcesPayload):
-        raise TypeError("Invalid payload for discover_and_crawl_sources job.")
     if not project.search_params:
         raise ValueError("Project must have search params to discover sources.")
 
+    warm_template_cache(project.templates.selector_generation)
+
     # --- Cancellation Setup ---
     cancellation_event = asyncio.Event()
 
-    async def poll_for_cancellation():
-        while not cancellation_event.is_set():
-            try:
-                current_job = await get_background_job(job.id)
-                if current_job and current_job.status == JobStatus.cancelling:
-                    cancellation_event.set()
-                    logger.info(
-                        f"[{job.id}] Cancellation requested for discover & crawl job."
-                    )
-                    break
-                await asyncio.sleep(5)
-            except asyncio.CancelledError:
-                break
-
-    polling_task = asyncio.create_task(poll_for_cancellation())
-
-    # --- Job State Initialization ---
-    db = await get_db_connection()
-    existing_db_links = set(await get_all_link_urls_for_project(project.id))
-    queue: deque[tuple[UUID, int]] = deque()
-    visited_source_urls: Set[str] = set()
-    all_new_links_this_job: Set[str] = set()
-    all_existing_links_found_again: Set[str] = set()
-    total_new_sources = 0
-    total_selectors_generated = 0
-    processed_count = 0
-    failed_source_ids: List[UUID] = []
-
-    async with db.transaction() as tx:
-        for source_id in job.payload.source_ids:
-            source = await get_project_source(source_id, tx=tx)
-            if source:
-                queue.append((source.id, 1))
-                visited_source_urls.add(source.url)
-        await update_job_with_notification(
-            job.id,
-            UpdateBackgroundJob(total_items=len(queue), processed_items=0, progress=0),
-            tx=tx,
-        )
-
-    scraper = Scraper()
-    provider = await _get_provider_for_project(project)
-    global_templates = await list_all_global_templates()
-    globals_dict = {gt.name: gt.content for gt in global_templates}
+    cancellation_task = asyncio.create_task(
+        _watch_for_cancellation(job, cancellation_event)
+    )
 
-    while queue:
-        if cancellation_event.is_set():
-            logger.info(
-                f"[{job.id}] Breaking discover & crawl loop due to cancellation."
+    try:
+        # --- Job State Initialization ---
+        db = await get_db_connection()
+        queue: asyncio.Queue[tuple[UUID, int]] = asyncio.Queue()
+        visited_source_urls: Set[str] = set()
+        all_found_links: Set[str] = set()
+        total_new_sources = 0
+        total_selectors_generated = 0
+        processed_count = 0
+        failed_source_ids: List[UUID] = []
+
+        async with db.transaction() as tx:
+            for source_id in payload.source_ids:
+                source = await get_project_source(source_id, tx=tx)
+                if source:
+                    queue.put_nowait((source.id, 1))
+                    visited_source_urls.add(source.url)
+            await update_job_with_notification(
+                job.id,
+                UpdateBackgroundJob(
+                    total_items=queue.qsize(), processed_items=0, progress=0
+                ),
+                tx=tx,
             )
-            break
 
-        source_id, current_depth = queue.popleft()
-        try:
-            source = await get_project_source(source_id)
-            if not source:
-                continue
+        scraper = Scraper()
+        provider = await _get_provider_for_project(project)
+        global_templates = await list_all_global_templates()
+        globals_dict = {gt.name: gt.content for gt in global_templates}
+        project_dump = project.model_dump()
 
-            # --- 1. Generate Selectors via LLM ---
-            logger.info(
-                f"[{job.id}] Generating selectors for source {source.id} at depth {current_depth}"
-            )
-            content = await scraper.get_content(source.url, clean=True, pretty=True)
-            context = {
-                "content": content,
-                "project": project.model_dump(),
-                "source": source.model_dump(),
-                "globals": globals_dict,
-            }
-            await wait_for_rate_limit(project.id, project.requests_per_minute)
+        async def crawl_source(source_id: UUID, current_depth: int):
+            nonlocal total_new_sources, total_selectors_generated, processed_count
+            try:
+                source = await get_project_source(source_id)
+                if not source:
+                    raise ValueError(f"Source {source_id} not found.")
 
-            if not project.templates.selector_generation:
-                raise ValueError(
-                    "Selector generation template is missing for this project."
+                # --- 1. Generate Selectors via LLM ---
+                logger.info(
+                    f"[{job.id}] Generating selectors for source {source.id} at depth {current_depth}"
                 )
+                content = await scraper.get_content(source.url, clean=True, pretty=True)
+                context = {
+                    "content": content,
+                    "project": project_dump,
+                    "source": source.model_dump(),
+                    "globals": globals_dict,
+                }
+                await wait_for_rate_limit(project.id, project.requests_per_minute)
+
+                if not project.templates.selector_generation:
+                    raise ValueError(
+                        "Selector generation template is missing for this project."
+                    )
 
-            response = await provider.generate(
-                ChatCompletionRequest(
-                    model=project.model_name,
-                    messages=create_messages_from_template(
-                        project.templates.selector_generation, context
-                    ),
-                    response_format=ResponseSchema(
-                        name="selector_response",
-                        schema_value=SelectorResponse.model_json_schema(),
-                    ),
-                    json_mode=JsonMode.prompt_engineering
-                    if project.json_enforcement_mode
-                    == JsonEnforcementMode.prompt_engineering
-                    else JsonMode.api_native,
-                    **project.model_parameters,
+                response = await provider.generate(
+                    ChatCompletionRequest(
+                        model=project.model_name,
+                        messages=create_messages_from_template(
+                            project.templates.selector_generation, context
+                        ),
+                        response_format=_response_schema(
+                            "selector_response", SelectorResponse
+                        ),
+                        json_mode=JsonMode.prompt_engineering
+                        if project.json_enforcement_mode
+                        == JsonEnforcementMode.prompt_engineering
+                        else JsonMode.api_native,
+                        **project.model_parameters,
+                    )
                 )
-            )
 
-            # --- DB Write Phase for this source ---
-            async with db.transaction() as tx:
-                if isinstance(response, ChatCompletionErrorResponse):
+                # --- DB Write Phase for this source ---
+                async with db.transaction() as tx:
+                    if isinstance(response, ChatCompletionErrorResponse):
+                        await create_api_request_log(
+                            CreateApiRequestLog(
+                                project_id=project.id,
+                                job_id=job.id,
+                                api_provider=provider.__class__.__name__,
+                                model_used=project.model_name,
+                                request=response.raw_request,
+                                response=response.raw_response,
+                                latency_ms=response.latency_ms,
+                                error=True,
+                            ),
+                        )
+                        raise Exception(
+                            f"Failed to generate selectors for source {source.id}: {response.raw_response}"
+                        )
+
                     await create_api_request_log(
                         CreateApiRequestLog(
                             project_id=project.id,
@@ -751,245 +941,243 @@ async def discover_and_crawl_sources(job: BackgroundJob, project: Project):
                             model_used=project.model_name,
                             request=response.raw_request,
                             response=response.raw_response,
+                            input_tokens=response.usage.prompt_tokens,
+                            output_tokens=response.usage.completion_tokens,
+                            calculated_cost=response.usage.cost,
                             latency_ms=response.latency_ms,
-                            error=True,
                         ),
                     )
-                    raise Exception(
-                        f"Failed to generate selectors for source {source.id}: {response.raw_response}"
+
+                    total_selectors_generated += 1
+                    selector_response = SelectorResponse.model_validate(
+                        response.content
+                    )
+                    await update_project_source(
+                        source.id,
+                        UpdateProjectSource(
+                            link_extraction_selector=selector_response.content_selectors,
+                            link_extraction_pagination_selector=selector_response.pagination_selector,
+                        ),
+                        tx=tx,
                     )
 
-                await create_api_request_log(
-                    CreateApiRequestLog(
-                        project_id=project.id,
-                        job_id=job.id,
-                        api_provider=provider.__class__.__name__,
-                        model_used=project.model_name,
-                        request=response.raw_request,
-                        response=response.raw_response,
-                        input_tokens=response.usage.prompt_tokens,
-                        output_tokens=response.usage.completion_tokens,
-                        calculated_cost=response.usage.cost,
-                        latency_ms=response.latency_ms,
-                    ),
+                    # --- 2. Crawl using the new selectors ---
+                    crawl_result = await _crawl_and_discover(
+                        project.id,
+                        source,
+                        selector_response,
+                        visited_source_urls,
+                        all_found_links,
+                        current_depth,
+                        scraper,
+                        tx,
+                    )
+                    total_new_sources += crawl_result.new_sources_created
+
+                for child_source_id in crawl_result.child_source_ids:
+                    queue.put_nowait((child_source_id, current_depth + 1))
+            except Exception as e:
+                logger.error(
+                    f"[{job.id}] Unrecoverable error processing source {source_id}: {e}",
+                    exc_info=True,
                 )
+                failed_source_ids.append(source_id)
+            finally:
+                # --- 3. Update Job Progress ---
+                processed_count += 1
+                async with db.transaction() as tx:
+                    await update_job_with_notification(
+                        job.id,
+                        UpdateBackgroundJob(
+                            processed_items=processed_count,
+                            total_items=len(visited_source_urls),
+                        ),
+                        tx=tx,
+                    )
 
-                total_selectors_generated += 1
-                selector_response = SelectorResponse.model_validate(response.content)
-                await update_project_source(
-                    source.id,
-                    UpdateProjectSource(
-                        link_extraction_selector=selector_response.content_selectors,
-                        link_extraction_pagination_selector=selector_response.pagination_selector,
-                    ),
-                    tx=tx,
-                )
+        try:
+            await _crawl_source_queue(queue, crawl_source, cancellation_event)
+        finally:
+            await scraper.aclose()
+        if cancellation_event.is_set():
+            logger.info(
+                f"[{job.id}] Stopped discover & crawl early due to cancellation."
+            )
 
-                # --- 2. Crawl using the new selectors ---
-                crawl_result = await _crawl_and_discover(
-                    project.id,
-                    source,
-                    selector_response,
-                    queue,
-                    visited_source_urls,
-                    current_depth,
-                    scraper,
-                    existing_db_links,
-                    all_new_links_this_job,
-                    tx,
+        # --- Finalization Phase ---
+        async with db.transaction() as tx:
+            if cancellation_event.is_set():
+                await update_job_with_notification(
+                    job.id, UpdateBackgroundJob(status=JobStatus.canceled), tx=tx
                 )
-                all_new_links_this_job.update(crawl_result.new_links)
-                all_existing_links_found_again.update(crawl_result.existing_links)
-                total_new_sources += crawl_result.new_sources_created
+                return
 
-        except Exception as e:
-            logger.error(
-                f"[{job.id}] Unrecoverable error processing source {source_id}: {e}",
-                exc_info=True,
+            new_links, existing_links = await diff_links_by_urls(
+                project.id, all_found_links, tx=tx
             )
-            failed_source_ids.append(source_id)
-        finally:
-            # --- 3. Update Job Progress ---
-            processed_count += 1
-            async with db.transaction() as tx:
-                await update_job_with_notification(
-                    job.id,
-                    UpdateBackgroundJob(
-                        processed_items=processed_count,
-                        total_items=len(visited_source_urls),
-                    ),
+            if project.status == ProjectStatus.search_params_generated:
+                await update_project(
+                    project.id,
+                    UpdateProject(status=ProjectStatus.selector_generated),
                     tx=tx,
                 )
 
-    polling_task.cancel()
-    # --- Finalization Phase ---
-    async with db.transaction() as tx:
-        if cancellation_event.is_set():
             await update_job_with_notification(
-                job.id, UpdateBackgroundJob(status=JobStatus.canceled), tx=tx
-            )
-            return
-
-        if project.status == ProjectStatus.search_params_generated:
-            await update_project(
-                project.id,
-                UpdateProject(status=ProjectStatus.selector_generated),
+                job.id,
+                UpdateBackgroundJob(
+                    status=JobStatus.completed,
+                    progress=100,
+                    result=DiscoverAndCrawlSourcesResult(
+                        new_links=sorted(new_links),
+                        existing_links=existing_links,
+                        new_sources_created=total_new_sources,
+                        selectors_generated=total_selectors_generated,
+                        sources_failed=failed_source_ids,
+                    ),
+                ),
                 tx=tx,
             )
+    finally:
+        cancellation_task.cancel()
 
-        await update_job_with_notification(
-            job.id,
-            UpdateBackgroundJob(
-                status=JobStatus.completed,
-                progress=100,
-                result=DiscoverAndCrawlSourcesResult(
-                    new_links=sorted(list(all_new_links_this_job)),
-                    existing_links=sorted(list(all_existing_links_found_again)),
-                    new_sources_created=total_new_sources,
-                    selectors_generated=total_selectors_generated,
-                    sources_failed=failed_source_ids,
-                ),
-            ),
-            tx=tx,
-        )
 
-
-async def rescan_links(job: BackgroundJob, project: Project):
+async def rescan_links(
+    job: BackgroundJob, project: Project, payload: DiscoverAndCrawlSourcesPayload
+):
     """
     Processes a job to re-crawl sources using existing selectors, without LLM calls.
     Found URLs are returned in the job result.
     """
-    if not isinstance(job.payload, DiscoverAndCrawlSourcesPayload):
-        raise TypeError("Invalid payload for rescan_links job.")
-
     # --- Cancellation Setup ---
     cancellation_event = asyncio.Event()
 
-    async def poll_for_cancellation():
-        while not cancellation_event.is_set():
-            try:
-                current_job = await get_background_job(job.id)
-                if current_job and current_job.status == JobStatus.cancelling:
-                    cancellation_event.set()
-                    logger.info(f"[{job.id}] Cancellation requested for rescan job.")
-                    break
-                await asyncio.sleep(5)
-            except asyncio.CancelledError:
-                break
-
-    polling_task = asyncio.create_task(poll_for_cancellation())
-
-    # --- Job State Initialization ---
-    db = await get_db_connection()
-    existing_db_links = set(await get_all_link_urls_for_project(project.id))
-    queue: deque[tuple[UUID, int]] = deque()
-    visited_source_urls: Set[str] = set()
-    all_new_links_this_job: Set[str] = set()
-    all_existing_links_found_again: Set[str] = set()
-    total_new_sources = 0
-    processed_count = 0
-    failed_source_ids: List[UUID] = []
+    cancellation_task = asyncio.create_task(
+        _watch_for_cancellation(job, cancellation_event)
+    )
 
-    async with db.transaction() as tx:
-        for source_id in job.payload.source_ids:
-            source = await get_project_source(source_id, tx=tx)
-            if source:
-                queue.append((source.id, 1))
-                visited_source_urls.add(source.url)
+    try:
+        # --- Job State Initialization ---
+        db = await get_db_connection()
+        queue: asyncio.Queue[tuple[UUID, int]] = asyncio.Queue()
+        visited_source_urls: Set[str] = set()
+        all_found_links: Set[str] = set()
+        total_new_sources = 0
+        processed_count = 0
+        failed_source_ids: List[UUID] = []
+
+        async with db.transaction() as tx:
+            for source_id in payload.source_ids:
+                source = await get_project_source(source_id, tx=tx)
+                if source:
+                    queue.put_nowait((source.id, 1))
+                    visited_source_urls.add(source.url)
 
-        await update_job_with_notification(
-            job.id,
-            UpdateBackgroundJob(total_items=len(queue), processed_items=0, progress=0),
-            tx=tx,
-        )
+            await update_job_with_notification(
+                job.id,
+                UpdateBackgroundJob(
+                    total_items=queue.qsize(), processed_items=0, progress=0
+                ),
+                tx=tx,
+            )
 
-    scraper = Scraper()
+        scraper = Scraper()
 
-    while queue:
-        if cancellation_event.is_set():
-            logger.info(f"[{job.id}] Breaking rescan loop due to cancellation.")
-            break
+        async def crawl_source(source_id: UUID, current_depth: int):
+            nonlocal total_new_sources, processed_count
+            try:
+                source = await get_project_source(source_id)
+                if not source:
+                    raise ValueError(f"Source {source_id} not found.")
+                if not source.link_extraction_selector:
+                    logger.warning(
+                        f"[{job.id}] Source {source_id} has no selectors, skipping rescan."
+                    )
+                    return
 
-        source_id, current_depth = queue.popleft()
-        try:
-            source = await get_project_source(source_id)
-            if not source or not source.link_extraction_selector:
-                logger.warning(
-                    f"[{job.id}] Source {source_id} has no selectors, skipping rescan."
+                logger.info(
+                    f"[{job.id}] Rescanning source {source.id} at depth {current_depth}"
                 )
-                continue
 
-            logger.info(
-                f"[{job.id}] Rescanning source {source.id} at depth {current_depth}"
-            )
-
-            async with db.transaction() as tx:
-                # --- 1. Crawl using existing selectors ---
-                selectors = SelectorResponse(
-                    content_selectors=source.link_extraction_selector,
-                    category_selectors=[],
-                    pagination_selector=source.link_extraction_pagination_selector,
-                )
-                crawl_result = await _crawl_and_discover(
-                    project.id,
-                    source,
-                    selectors,
-                    queue,
-                    visited_source_urls,
-                    current_depth,
-                    scraper,
-                    existing_db_links,
-                    all_new_links_this_job,
-                    tx,
+                async with db.transaction() as tx:
+                    # --- 1. Crawl using existing selectors ---
+                    selectors = SelectorResponse(
+                        content_selectors=source.link_extraction_selector,
+                        category_selectors=[],
+                        pagination_selector=source.link_extraction_pagination_selector,
+                    )
+                    crawl_result = await _crawl_and_discover(
+                        project.id,
+                        source,
+                        selectors,
+                        visited_source_urls,
+                        all_found_links,
+                        current_depth,
+                        scraper,
+                        tx,
+                    )
+                    total_new_sources += crawl_result.new_sources_created
+
+                for child_source_id in crawl_result.child_source_ids:
+                    queue.put_nowait((child_source_id, current_depth + 1))
+            except Exception as e:
+                logger.error(
+                    f"[{job.id}] Failed to rescan source {source_id}: {e}",
+                    exc_info=True,
                 )
-                all_new_links_this_job.update(crawl_result.new_links)
-                all_existing_links_found_again.update(crawl_result.existing_links)
-                total_new_sources += crawl_result.new_sources_created
-        except Exception as e:
-            logger.error(
-                f"[{job.id}] Failed to rescan source {source_id}: {e}", exc_info=True
-            )
-            failed_source_ids.append(source_id)
+                failed_source_ids.append(source_id)
+            finally:
+                # --- 2. Update Job Progress ---
+                processed_count += 1
+                async with db.transaction() as tx:
+                    await update_job_with_notification(
+                        job.id,
+                        UpdateBackgroundJob(
+                            processed_items=processed_count,
+                            total_items=len(visited_source_urls),
+                        ),
+                        tx=tx,
+                    )
+
+        try:
+            await _crawl_source_queue(queue, crawl_source, cancellation_event)
         finally:
-            # --- 2. Update Job Progress ---
-            processed_count += 1
-            async with db.transaction() as tx:
+            await scraper.aclose()
+        if cancellation_event.is_set():
+            logger.info(f"[{job.id}] Stopped rescan early due to cancellation.")
+
+        # --- Finalization Phase ---
+        async with db.transaction() as tx:
+            if cancellation_event.is_set():
                 await update_job_with_notification(
-                    job.id,
-                    UpdateBackgroundJob(
-                        processed_items=processed_count,
-                        total_items=len(visited_source_urls),
-                    ),
-                    tx=tx,
+                    job.id, UpdateBackgroundJob(status=JobStatus.canceled), tx=tx
                 )
+                return
 
-    polling_task.cancel()
-    # --- Finalization Phase ---
-    async with db.transaction() as tx:
-        if cancellation_event.is_set():
-            await update_job_with_notification(
-                job.id, UpdateBackgroundJob(status=JobStatus.canceled), tx=tx
+            new_links, existing_links = await diff_links_by_urls(
+                project.id, all_found_links, tx=tx
             )
-            return
-
-        await update_job_with_notification(
-            job.id,
-            UpdateBackgroundJob(
-                status=JobStatus.completed,
-                progress=100,
-                result=DiscoverAndCrawlSourcesResult(
-                    new_links=sorted(list(all_new_links_this_job)),
-                    existing_links=sorted(list(all_existing_links_found_again)),
-                    new_sources_created=total_new_sources,
-                    selectors_generated=0,
-                    sources_failed=failed_source_ids,
+            await update_job_with_notification(
+                job.id,
+                UpdateBackgroundJob(
+                    status=JobStatus.completed,
+                    progress=100,
+                    result=DiscoverAndCrawlSourcesResult(
+                        new_links=sorted(new_links),
+                        existing_links=existing_links,
+                        new_sources_created=total_new_sources,
+                        selectors_generated=0,
+                        sources_failed=failed_source_ids,
+                    ),
                 ),
-            ),
-            tx=tx,
-        )
+                tx=tx,
+            )
+    finally:
+        cancellation_task.cancel()
 
 
-async def generate_search_params(job: BackgroundJob, project: Project):
+async def generate_search_params(
+    job: BackgroundJob, project: Project, payload: GenerateSearchParamsPayload
+):
     if not project.prompt:
         raise ValueError("Project must have a prompt")
 
@@ -1015,9 +1203,8 @@ async def generate_search_params(job: BackgroundJob, project: Project):
                     project.templates.search_params_generation,
                     context,
                 ),
-                response_format=ResponseSchema(
-                    name="search_params_response",
-                    schema_value=SearchParamsResponse.model_json_schema(),
+                response_format=_response_schema(
+                    "search_params_response", SearchParamsResponse
                 ),
                 json_mode=JsonMode.prompt_engineering
                 if project.json_enforcement_mode
@@ -1080,12 +1267,11 @@ async def generate_search_params(job: BackgroundJob, project: Project):
         )
 
 
-async def confirm_links(job: BackgroundJob, project: Project):
-    if not isinstance(job.payload, ConfirmLinksPayload):
-        raise Exception("Invalid payload for confirm_links task")
-
+async def confirm_links(
+    job: BackgroundJob, project: Project, payload: ConfirmLinksPayload
+):
     async with (await get_db_connection()).transaction() as tx:
-        if not job.payload.urls:
+        if not payload.urls:
             logger.warning(f"[{job.id}] Confirm links job received no URLs to save.")
             await update_job_with_notification(
                 job.id,
@@ -1098,7 +1284,7 @@ async def confirm_links(job: BackgroundJob, project: Project):
             return
 
         links_to_create = [
-            CreateLink(project_id=project.id, url=url) for url in job.payload.urls
+            CreateLink(project_id=project.id, url=url) for url in payload.urls
         ]
 
         links = await create_links(links_to_create, tx=tx)
@@ -1118,7 +1304,12 @@ async def confirm_links(job: BackgroundJob, project: Project):
 
 
 async def _process_single_link_io(
-    job: BackgroundJob, project: Project, link: Link, scraper: Scraper
+    job: BackgroundJob,
+    project: Project,
+    link: Link,
+    scraper: Scraper,
+    project_dump: Dict[str, Any],
+    globals_dict: Dict[str, str],
 ) -> LinkProcessingResult:
     """
     Phase 1 of processing a link: Perform all I/O-bound operations (scraping, LLM call).
@@ -1132,10 +1323,8 @@ async def _process_single_link_io(
         )
         provider = await _get_provider_for_project(project)
 
-        global_templates = await list_all_global_templates()
-        globals_dict = {gt.name: gt.content for gt in global_templates}
         context = {
-            "project": project.model_dump(),
+            "project": project_dump,
             "content": content,
             "source": link.model_dump(),
             "globals": globals_dict,
@@ -1150,9 +1339,8 @@ async def _process_single_link_io(
                 messages=create_messages_from_template(
                     project.templates.entry_creation, context
                 ),
-                response_format=ResponseSchema(
-                    name="lorebook_entry_response",
-                    schema_value=LorebookEntryResponse.model_json_schema(),
+                response_format=_response_schema(
+                    "lorebook_entry_response", LorebookEntryResponse
                 ),
                 json_mode=JsonMode.prompt_engineering
                 if project.json_enforcement_mode
@@ -1221,59 +1409,73 @@ async def _process_db_batch(
     within a single transaction.
     """
     counts = {"created": 0, "skipped": 0, "failed": 0}
+    # Logs are written outside the batch transaction, as before, so they are
+    # kept even if the batch itself fails.
+    await create_api_request_logs(
+        [result.log_payload for result in batch_results if result.log_payload]
+    )
+    successes = [r for r in batch_results if isinstance(r, LinkSuccessResult)]
     async with (await get_db_connection()).transaction() as tx:
+        created_entries = await create_lorebook_entries(
+            [result.entry_payload for result in successes], tx=tx
+        )
+
+        link_updates: List[tuple[UUID, UpdateLink]] = [
+            (
+                result.link_id,
+                UpdateLink(
+                    status=LinkStatus.completed,
+                    lorebook_entry_id=created_entry.id,
+                    raw_content=result.raw_content,
+                ),
+            )
+            for result, created_entry in zip(successes, created_entries)
+        ]
         for result in batch_results:
-            if result.log_payload:
-                await create_api_request_log(result.log_payload)
-
-            if isinstance(result, LinkSuccessResult):
-                created_entry = await create_lorebook_entry(result.entry_payload, tx=tx)
-                await update_link(
-                    result.link_id,
-                    UpdateLink(
-                        status=LinkStatus.completed,
-                        lorebook_entry_id=created_entry.id,
-                        raw_content=result.raw_content,
-                    ),
-                    tx=tx,
-                )
-                await send_entry_created_notification(job, created_entry)
-                counts["created"] += 1
-            elif isinstance(result, LinkSkippedResult):
-                await update_link(
-                    result.link_id,
-                    UpdateLink(status=LinkStatus.skipped, skip_reason=result.reason),
-                    tx=tx,
+            if isinstance(result, LinkSkippedResult):
+                link_updates.append(
+                    (
+                        result.link_id,
+                        UpdateLink(status=LinkStatus.skipped, skip_reason=result.reason),
+                    )
                 )
                 counts["skipped"] += 1
             elif isinstance(result, LinkFailedResult):
-                await update_link(
-                    result.link_id,
-                    UpdateLink(
-                        status=LinkStatus.failed, error_message=result.error_message
-                    ),
-                    tx=tx,
+                link_updates.append(
+                    (
+                        result.link_id,
+                        UpdateLink(
+                            status=LinkStatus.failed,
+                            error_message=result.error_message,
+                        ),
+                    )
                 )
                 counts["failed"] += 1
+        counts["created"] = len(created_entries)
 
-            updated_link = await get_link(result.link_id, tx=tx)
-            if updated_link:
-                await send_link_updated_notification(job, updated_link)
+        updated_links = await update_links_bulk(link_updates, tx=tx)
+
+    # Notify only once the batch has committed, so the transaction (and its
+    # connection) isn't held open for the duration of the pushes.
+    await asyncio.gather(
+        *(send_entry_created_notification(job, entry) for entry in created_entries),
+        *(send_link_updated_notification(job, link) for link in updated_links),
+    )
     return counts
 
 
-async def process_project_entries(job: BackgroundJob, project: Project):
+async def process_project_entries(
+    job: BackgroundJob, project: Project, payload: ProcessProjectEntriesPayload
+):
     """
     Process all pending links for a project to generate lorebook entries using a
     concurrent I/O phase and a batched, transactional database write phase.
     """
-    if not isinstance(job.payload, ProcessProjectEntriesPayload):
-        raise Exception("Invalid payload for process_project_entries task")
-
+    warm_template_cache(project.templates.entry_creation)
     scraper = Scraper()
     # If specific link_ids are provided, use them. Otherwise, get all processable links.
-    if job.payload.link_ids:
-        links_to_process = await get_links_by_ids(job.payload.link_ids)
+    if payload.link_ids:
+        links_to_process = await get_links_by_ids(payload.link_ids)
     else:
         links_to_process = await get_processable_links_for_project(project.id)
 
@@ -1310,90 +1512,156 @@ async def process_project_entries(job: BackgroundJob, project: Project):
             ),
             tx=tx,
         )
-        for link in links_to_process:
-            await update_link(link.id, UpdateLink(status=LinkStatus.processing), tx=tx)
-            updated_link = await get_link(link.id, tx=tx)
-            if updated_link:
-                await send_link_updated_notification(job, updated_link)
+        processing_links = await bulk_mark_links_processing(
+            [link.id for link in links_to_process], tx=tx
+        )
+        await asyncio.gather(
+            *(send_link_updated_notification(job, link) for link in processing_links)
+        )
 
     # --- Phase 1 & 2: Concurrent I/O and Batched DB Writes ---
     cancellation_event = asyncio.Event()
-    semaphore = asyncio.Semaphore(CONCURRENT_REQUESTS)
 
-    async def poll_for_cancellation():
-        while not cancellation_event.is_set():
-            try:
-                current_job = await get_background_job(job.id)
-                if current_job and current_job.status == JobStatus.cancelling:
-                    cancellation_event.set()
-                    break
-                await asyncio.sleep(5)
-            except asyncio.CancelledError:
-                break
+    cancellation_task = asyncio.create_task(
+        _watch_for_cancellation(job, cancellation_event)
+    )
 
-    polling_task = asyncio.create_task(poll_for_cancellation())
+    # Global templates and the project's template context are built once per
+    # job rather than once per link.
+    global_templates = await list_all_global_templates()
+    globals_dict = {gt.name: gt.content for gt in global_templates}
+    project_dump = project.model_dump()
+
+    # A fixed pool of workers pulls links from a shared iterator, so the number
+    # of live coroutines stays at CONCURRENT_REQUESTS no matter how many links
+    # there are. The result queue is bounded so workers wait for the DB writer
+    # instead of piling up finished results when writes fall behind.
+    pending_links = iter(links_to_process)
+    result_queue: asyncio.Queue[Optional[LinkProcessingResult]] = asyncio.Queue(
+        maxsize=DB_WRITE_BATCH_SIZE * 2
+    )
 
-    async def process_with_limiter(link: Link) -> Optional[LinkProcessingResult]:
-        if cancellation_event.is_set():
-            return None
-        async with semaphore:
+    async def worker():
+        for link in pending_links:
             await wait_for_rate_limit(project.id, project.requests_per_minute)
-            if cancellation_event.is_set():
-                return None
-            return await _process_single_link_io(job, project, link, scraper)
+            await result_queue.put(
+                await _process_single_link_io(
+                    job, project, link, scraper, project_dump, globals_dict
+                )
+            )
 
-    tasks = [
-        asyncio.create_task(process_with_limiter(link)) for link in links_to_process
+    workers = [
+        asyncio.create_task(worker())
+        for _ in range(min(CONCURRENT_REQUESTS, total_links))
     ]
 
+    worker_errors: List[Exception] = []
+
+    async def close_results():
+        # One failed worker stops the whole pool, so the job fails promptly
+        # instead of carrying on without it.
+        _, still_running = await asyncio.wait(
+            workers, return_when=asyncio.FIRST_EXCEPTION
+        )
+        for task in still_running:
+            task.cancel()
+        # Cancelled workers are gathered like finished ones; the sentinel tells
+        # the writer loop below that no more results will arrive.
+        for outcome in await asyncio.gather(*workers, return_exceptions=True):
+            if isinstance(outcome, Exception):
+                logger.error(
+                    f"[{job.id}] Entry worker failed: {outcome}", exc_info=outcome
+                )
+                worker_errors.append(outcome)
+        await result_queue.put(None)
+
+    async def cancel_workers():
+        # Abort every link still waiting on the rate limiter or I/O as soon as
+        # cancellation is requested.
+        await cancellation_event.wait()
+        for task in workers:
+            task.cancel()
+
+    close_results_task = asyncio.create_task(close_results())
+    cancel_workers_task = asyncio.create_task(cancel_workers())
+
     batch_results: List[LinkProcessingResult] = []
     total_processed = 0
     total_created = 0
     total_skipped = 0
     total_failed = 0
 
-    for future in asyncio.as_completed(tasks):
-        result = await future
-        if result:
-            batch_results.append(result)
-
-        # Process a batch when it's full or when all tasks are done
-        if len(batch_results) >= DB_WRITE_BATCH_SIZE or (
-            total_processed + len(batch_results) == total_links
-        ):
-            if not batch_results:
-                continue
-
-            counts = await _process_db_batch(job, batch_results)
-            total_created += counts["created"]
-            total_skipped += counts["skipped"]
-            total_failed += counts["failed"]
-            total_processed += len(batch_results)
-            batch_results.clear()
+    last_progress_flush = time.monotonic()
+
+    async def write_batch():
+        nonlocal total_processed, total_created, total_skipped, total_failed
+        nonlocal last_progress_flush
+        counts = await _process_db_batch(job, batch_results)
+        total_created += counts["created"]
+        total_skipped += counts["skipped"]
+        total_failed += counts["failed"]
+        total_processed += len(batch_results)
+        batch_results.clear()
+
+        # Progress is throttled; the finalization update below always carries
+        # the final counts, so skipped updates are never lost.
+        now = time.monotonic()
+        if now - last_progress_flush < PROGRESS_FLUSH_INTERVAL:
+            return
+        last_progress_flush = now
+        progress = (total_processed / total_links) * 100
+        async with (await get_db_connection()).transaction() as tx:
+            await update_job_with_notification(
+                job.id,
+                UpdateBackgroundJob(processed_items=total_processed, progress=progress),
+                tx=tx,
+            )
 
-            # Update overall job progress after each batch is written
-            progress = (total_processed / total_links) * 100
-            async with (await get_db_connection()).transaction() as tx:
-                await update_job_with_notification(
-                    job.id,
-                    UpdateBackgroundJob(
-                        processed_items=total_processed, progress=progress
-                    ),
-                    tx=tx,
-                )
+    try:
+        while (result := await result_queue.get()) is not None:
+            batch_results.append(result)
 
-    polling_task.cancel()
+            # Process a batch when it's full or when all links are done
+            if len(batch_results) >= DB_WRITE_BATCH_SIZE or (
+                total_processed + len(batch_results) == total_links
+            ):
+                await write_batch()
+
+        # Results that finished before a cancellation are still worth saving.
+        if batch_results:
+            await write_batch()
+    finally:
+        for task in workers:
+            task.cancel()
+        close_results_task.cancel()
+        cancel_workers_task.cancel()
+        cancellation_task.cancel()
+        await scraper.aclose()
 
     # --- Finalization Phase ---
     async with (await get_db_connection()).transaction() as tx:
-        if cancellation_event.is_set():
-            await update_job_with_notification(
-                job.id, UpdateBackgroundJob(status=JobStatus.canceled), tx=tx
-            )
+        if cancellation_event.is_set() or worker_errors:
+            # Links that were never reached, or taken by a worker that failed,
+            # are still 'processing'; hand them back so the job can run again.
             await tx.execute(
                 "UPDATE \"Link\" SET status = 'pending' WHERE project_id = %s AND status = 'processing'",
                 (project.id,),
             )
+
+        if cancellation_event.is_set():
+            await update_job_with_notification(
+                job.id,
+                UpdateBackgroundJob(
+                    status=JobStatus.canceled,
+                    processed_items=total_processed,
+                    progress=(total_processed / total_links) * 100,
+                ),
+                tx=tx,
+            )
+        elif worker_errors:
+            await update_project(
+                project.id, UpdateProject(status=ProjectStatus.failed), tx=tx
+            )
         else:
             final_project_status = (
                 ProjectStatus.completed if total_failed == 0 else ProjectStatus.failed
@@ -1405,6 +1673,8 @@ async def process_project_entries(job: BackgroundJob, project: Project):
                 job.id,
                 UpdateBackgroundJob(
                     status=JobStatus.completed,
+                    processed_items=total_processed,
+                    progress=100,
                     result=ProcessProjectEntriesResult(
                         entries_created=total_created,
                         entries_failed=total_failed,
@@ -1414,20 +1684,45 @@ async def process_project_entries(job: BackgroundJob, project: Project):
                 tx=tx,
             )
 
+    if worker_errors and not cancellation_event.is_set():
+        # Marks the job failed in process_background_job.
+        raise RuntimeError(
+            f"Processed {total_processed} of {total_links} links before a worker failed: {worker_errors[0]}"
+        ) from worker_errors[0]
+
 
 # --- Main Job Processor ---
 
-JOB_HANDLERS = {
+JobHandler = Callable[[BackgroundJob, Project, Any], Awaitable[None]]
+
+# Maps each task to the payload model its handler expects, so the payload is
+# checked once here instead of inside every handler.
+JOB_HANDLERS: Dict[TaskName, Tuple[Type[BaseModel], JobHandler]] = {
     # Lorebook Jobs
-    TaskName.DISCOVER_AND_CRAWL_SOURCES: discover_and_crawl_sources,
-    TaskName.RESCAN_LINKS: rescan_links,
-    TaskName.CONFIRM_LINKS: confirm_links,
-    TaskName.PROCESS_PROJECT_ENTRIES: process_project_entries,
-    TaskName.GENERATE_SEARCH_PARAMS: generate_search_params,
+    TaskName.DISCOVER_AND_CRAWL_SOURCES: (
+        DiscoverAndCrawlSourcesPayload,
+        discover_and_crawl_sources,
+    ),
+    TaskName.RESCAN_LINKS: (DiscoverAndCrawlSourcesPayload, rescan_links),
+    TaskName.CONFIRM_LINKS: (ConfirmLinksPayload, confirm_links),
+    TaskName.PROCESS_PROJECT_ENTRIES: (
+        ProcessProjectEntriesPayload,
+        process_project_entries,
+    ),
+    TaskName.GENERATE_SEARCH_PARAMS: (
+        GenerateSearchParamsPayload,
+        generate_search_params,
+    ),
     # Character Jobs
-    TaskName.FETCH_SOURCE_CONTENT: fetch_source_content,
-    TaskName.GENERATE_CHARACTER_CARD: generate_character_card,
-    TaskName.REGENERATE_CHARACTER_FIELD: regenerate_character_field,
+    TaskName.FETCH_SOURCE_CONTENT: (FetchSourceContentPayload, fetch_source_content),
+    TaskName.GENERATE_CHARACTER_CARD: (
+        GenerateCharacterCardPayload,
+        generate_character_card,
+    ),
+    TaskName.REGENERATE_CHARACTER_FIELD: (
+        RegenerateCharacterFieldPayload,
+        regenerate_character_field,
+    ),
 }
 
 
@@ -1440,20 +1735,28 @@ async def process_background_job(id: UUID):
         logger.error(f"[{job.id}] Job has no project_id")
         return
 
-    project = await get_project(job.project_id)
+    project = await get_project_cached(job.project_id)
     if not project:
         logger.error(f"[{job.id}] Project not found: {job.project_id}")
         return
 
     try:
-        handler = JOB_HANDLERS.get(job.task_name)
-        if handler:
-            await handler(job, project)
-        else:
+        entry = JOB_HANDLERS.get(job.task_name)
+        if not entry:
             logger.error(f"[{job.id}] No handler found for task: {job.task_name}")
             # To ensure the job is marked as failed, we can raise an exception
             raise ValueError(f"No handler for task {job.task_name}")
 
+        payload_model, handler = entry
+        # _deserialize_job has usually parsed the payload already; only
+        # validate it again when it came back as something else.
+        payload = job.payload
+        if not isinstance(payload, payload_model):
+            payload = payload_model.model_validate(
+                payload.model_dump() if isinstance(payload, BaseModel) else payload
+            )
+        await handler(job, project, payload)
+
     except Exception as e:
         logger.error(f"[{job.id}] Error processing job: {e}", exc_info=True)
         async with (await get_db_connection()).transaction() as tx:
@@ -1,21 +1,60 @@
 import asyncio
-import base64
-import io
-import json
+import hashlib
+import os
 import httpx
-import yaml
-from PIL import Image
-import aichar
-from typing import Dict, Any
-from urllib.parse import urlparse, quote, unquote
+from typing import Dict, Any, Optional, Tuple
+from urllib.parse import urlparse
 from urllib.request import url2pathname
 import re
 from pathlib import Path
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 from logging_config import get_logger
 
 logger = get_logger(__name__)
 
+# Upper bound on the size of a card file. Cards are small JSON/YAML files or
+# PNGs with the data embedded, so anything past this is not worth buffering.
+MAX_CARD_BYTES = 16 * 1024 * 1024
+CARD_DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# aichar's parsers are synchronous. They get their own small pool so a batch of
+# card imports can't tie up the default executor other blocking calls share.
+_CARD_PARSER_POOL = ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1), thread_name_prefix="cardparse")
+
+# Parsed card fields keyed by (format, SHA-256 of the card bytes), since the
+# same card is often imported into several projects. Only the small field
+# dicts are kept, never the card bytes.
+PARSED_CARD_CACHE_SIZE = 256
+_parsed_card_cache: "OrderedDict[Tuple[str, bytes], Dict[str, Any]]" = OrderedDict()
+
+# Names of the aichar loader for each card format.
+_CARD_LOADERS = {
+    'yaml': 'load_character_yaml',
+    'json': 'load_character_json',
+    'png': 'load_character_card',
+}
+
+# Card fields in output order, with the section heading each one gets. These
+# are exactly the keys _load_card_fields produces.
+_FIELD_LABELS = tuple(
+    (key, f"--- {label.upper()} ---\n")
+    for key, label in (
+        ("name", "Name"),
+        ("description", "Description"),
+        ("personality", "Personality"),
+        ("scenario", "Scenario"),
+        ("first_mes", "First Message"),
+        ("mes_example", "Example Messages"),
+    )
+)
+
+_PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# A single drive letter followed by a colon and a (back)slash, e.g. C:\ or D:/
+_WIN_DRIVE_RE = re.compile(r'^([a-zA-Z]):[\\/](.*)')
+
 class CharacterCardParseError(Exception):
     """Custom exception for character card parsing failures."""
     pass
@@ -27,10 +66,7 @@ def _translate_windows_path_to_linux(path_str: str) -> str:
     Linux Docker mount path (e.g., /d/path/to/file).
     This assumes Docker Desktop is mounting drives as /c, /d, etc.
     """
-    # Regex to match a single drive letter followed by a colon and a backslash
-    # e.g., C:\ or D:\
-    import re
-    match = re.match(r'^([a-zA-Z]):[\\/](.*)', path_str)
+    match = _WIN_DRIVE_RE.match(path_str)
     
     if match:
         drive_letter = match.group(1).lower()
@@ -43,10 +79,66 @@ def _translate_windows_path_to_linux(path_str: str) -> str:
     
     return path_str
 
-async def fetch_and_parse_character_card(url: str) -> str:
+def _load_card_fields(card_format: str, content: Any) -> Dict[str, Any]:
+    """Parses a card with aichar and maps it to our field names."""
+    # aichar is a native extension that only card imports need, so it is
+    # loaded on first use rather than whenever this module is imported.
+    import aichar
+
+    char_class = getattr(aichar, _CARD_LOADERS[card_format])(content)
+    return {
+        "name": char_class.name,
+        "description": char_class.summary,
+        "personality": char_class.personality,
+        "scenario": char_class.scenario,
+        "first_mes": char_class.greeting_message,
+        "mes_example": char_class.example_messages,
+    }
+
+async def _parse_card(card_format: str, content_bytes: bytes, content: Any) -> Dict[str, Any]:
+    """
+    Parses a card on the parser pool, reusing the result for a card with
+    identical bytes that was parsed before.
+    """
+    key = (card_format, hashlib.sha256(content_bytes).digest())
+    cached = _parsed_card_cache.get(key)
+    if cached is not None:
+        _parsed_card_cache.move_to_end(key)
+        return dict(cached)
+
+    data = await asyncio.get_running_loop().run_in_executor(_CARD_PARSER_POOL, _load_card_fields, card_format, content)
+    _parsed_card_cache[key] = data
+    if len(_parsed_card_cache) > PARSED_CARD_CACHE_SIZE:
+        _parsed_card_cache.popitem(last=False)
+    return dict(data)
+
+def _read_local_card(file_path: Path) -> bytes:
+    """Reads at most MAX_CARD_BYTES + 1 bytes, so oversized files can be detected."""
+    with open(file_path, 'rb') as f:
+        return f.read(MAX_CARD_BYTES + 1)
+
+async def _download_card(client: httpx.AsyncClient, url: str) -> bytes:
+    """Downloads a remote card, refusing anything larger than MAX_CARD_BYTES."""
+    async with client.stream('GET', url, timeout=10) as response:
+        response.raise_for_status()
+        content_length = response.headers.get('Content-Length')
+        if content_length and content_length.isdigit() and int(content_length) > MAX_CARD_BYTES:
+            raise CharacterCardParseError(f"Remote card {url} is too large ({content_length} bytes)")
+        # Read in chunks so an oversized (or endless) response is
+        # cut off at the cap instead of being buffered whole.
+        buffer = bytearray()
+        async for chunk in response.aiter_bytes(CARD_DOWNLOAD_CHUNK_SIZE):
+            buffer += chunk
+            if len(buffer) > MAX_CARD_BYTES:
+                raise CharacterCardParseError(f"Remote card {url} is larger than {MAX_CARD_BYTES} bytes")
+        return bytes(buffer)
+
+async def fetch_and_parse_character_card(url: str, client: Optional[httpx.AsyncClient] = None) -> str:
     """
     Fetches a character card from a URL (remote or local file path) and extracts
     the character data into a formatted string.
+    Pass a shared `client` when fetching several cards so their connections are
+    reused; otherwise a client is created for this one request.
     """
     parsed_url = urlparse(url)
     content_bytes: bytes
@@ -76,23 +168,26 @@ async def fetch_and_parse_character_card(url: str) -> str:
         
         file_path = Path(translated_path)
         
-        if not file_path.is_file():
+        # Opening directly (rather than checking is_file() first) saves a stat
+        # per card; a missing path or a directory fails the open instead.
+        try:
+            content_bytes = await asyncio.to_thread(_read_local_card, file_path)
+        except (FileNotFoundError, IsADirectoryError, NotADirectoryError):
             # Log the path we actually attempted to open (without resolving, which causes the Docker CWD issue)
             logger.error(f"Attempted to open path: {file_path}")
             raise CharacterCardParseError(f"Local file not found: {url}")
-        
-        try:
-            with open(file_path, 'rb') as f:
-                content_bytes = f.read()
         except Exception as e:
             raise CharacterCardParseError(f"Failed to read local file {url}: {e}")
+        if len(content_bytes) > MAX_CARD_BYTES:
+            raise CharacterCardParseError(f"Local card {url} is larger than {MAX_CARD_BYTES} bytes")
     elif parsed_url.scheme in ('http', 'https'):
         # Handle remote URL
         try:
-            async with httpx.AsyncClient(follow_redirects=True, timeout=10) as client:
-                response = await client.get(url)
-                response.raise_for_status()
-                content_bytes = response.content
+            if client is None:
+                async with httpx.AsyncClient(follow_redirects=True, timeout=10) as own_client:
+                    content_bytes = await _download_card(own_client, url)
+            else:
+                content_bytes = await _download_card(client, url)
         except httpx.HTTPStatusError as e:
             raise CharacterCardParseError(f"Failed to fetch remote URL {url}: HTTP error {e.response.status_code}")
         except httpx.RequestError as e:
@@ -100,30 +195,19 @@ async def fetch_and_parse_character_card(url: str) -> str:
     else:
         raise CharacterCardParseError(f"Unsupported URL scheme: {parsed_url.scheme}")
 
-    # Determine if content is JSON/TXT, YAML, or PNG
-    if url.lower().endswith(('.json', '.txt', '.yaml', '.yml')) or content_bytes.startswith(b'{'):
+    # Determine if content is JSON/TXT, YAML, or PNG. The PNG signature is
+    # checked first so image bytes are never decoded as text, whatever the URL.
+    lower_url = url.lower()
+    is_png = content_bytes.startswith(_PNG_SIGNATURE)
+    if not is_png and (lower_url.endswith(('.json', '.txt', '.yaml', '.yml')) or content_bytes.startswith(b'{')):
         content_str = content_bytes.decode('utf-8')
         
         # Determine if content is JSON or YAML based on extension or content start
-        is_yaml = url.lower().endswith(('.yaml', '.yml')) or (not content_str.startswith('{') and not content_str.startswith('['))
+        is_yaml = lower_url.endswith(('.yaml', '.yml')) or (not content_str.startswith('{') and not content_str.startswith('['))
         
         try:
-            if is_yaml:
-                # Use aichar for YAML parsing
-                char_class = await asyncio.to_thread(aichar.load_character_yaml, content_str)
-            else:
-                # Use aichar for JSON parsing
-                char_class = await asyncio.to_thread(aichar.load_character_json, content_str)
-            
-            # Convert CharacterClass object to a dictionary matching our expected structure
-            data = {
-                "name": char_class.name,
-                "description": char_class.summary,
-                "personality": char_class.personality,
-                "scenario": char_class.scenario,
-                "first_mes": char_class.greeting_message,
-                "mes_example": char_class.example_messages,
-            }
+            # Use aichar for YAML or JSON parsing
+            data = await _parse_card('yaml' if is_yaml else 'json', content_bytes, content_str)
             
             # We skip _parse_json_card since aichar already handles V1/Pygmalion normalization
             
@@ -131,21 +215,10 @@ async def fetch_and_parse_character_card(url: str) -> str:
             # If parsing fails, raise a clear error.
             logger.error(f"Failed to parse JSON/YAML card using aichar: {e}", exc_info=True)
             raise CharacterCardParseError(f"Failed to parse character card (JSON/YAML format). Underlying error: {e}")
-    elif url.lower().endswith('.png') or content_bytes.startswith(b'\x89PNG'):
+    elif is_png or lower_url.endswith('.png'):
         # Use aichar for robust PNG parsing
         try:
-            # aichar.load_character_card is synchronous, run it in a thread
-            char_class = await asyncio.to_thread(aichar.load_character_card, content_bytes)
-            
-            # Convert CharacterClass object to a dictionary matching our expected structure
-            data = {
-                "name": char_class.name,
-                "description": char_class.summary,
-                "personality": char_class.personality,
-                "scenario": char_class.scenario,
-                "first_mes": char_class.greeting_message,
-                "mes_example": char_class.example_messages,
-            }
+            data = await _parse_card('png', content_bytes, content_bytes)
             
         except Exception as e:
             # If aichar fails, we raise a clear error.
@@ -158,24 +231,11 @@ async def fetch_and_parse_character_card(url: str) -> str:
     # The data variable now holds the normalized dictionary from aichar parsing (PNG, JSON, or YAML)
     char_data = data
 
-    formatted_content = f"CHARACTER CARD SOURCE: {url}\n\n"
-    
-    # Map common fields to a readable format
-    fields_to_include = {
-        "name": "Name",
-        "description": "Description",
-        "personality": "Personality",
-        "persona": "Personality", # Handle alternative key
-        "scenario": "Scenario",
-        "first_mes": "First Message",
-        "first_message": "First Message", # Handle alternative key
-        "mes_example": "Example Messages",
-        "example_messages": "Example Messages", # Handle alternative key
-    }
+    parts = [f"CHARACTER CARD SOURCE: {url}\n\n"]
 
-    for key, label in fields_to_include.items():
+    for key, heading in _FIELD_LABELS:
         value = char_data.get(key)
         if value and isinstance(value, str):
-            formatted_content += f"--- {label.upper()} ---\n{value.strip()}\n\n"
+            parts.append(f"{heading}{value.strip()}\n\n")
 
-    return formatted_content.strip()
\ No newline at end of file
+    return "".join(parts).strip()
\ No newline at end of file
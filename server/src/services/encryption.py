@@ -1,11 +1,14 @@
 import os
 import base64
 import hashlib
-from cryptography.fernet import Fernet
+from typing import TYPE_CHECKING, Optional
 from litestar.exceptions import HTTPException
 
 from logging_config import get_logger
 
+if TYPE_CHECKING:
+    from cryptography.fernet import Fernet
+
 logger = get_logger(__name__)
 
 
@@ -31,20 +34,31 @@ if not APP_SECRET_KEY_PHRASE:
     raise ValueError("APP_SECRET_KEY is not set. Please define it in your .env file.")
 
 # Derive a valid Fernet key from the user's phrase
-try:
-    derived_key = derive_key(APP_SECRET_KEY_PHRASE)
-    fernet = Fernet(derived_key)
-except Exception as e:
-    logger.error(
-        f"Failed to initialize encryption service. Your APP_SECRET_KEY may be invalid. Error: {e}"
-    )
-    raise ValueError("Invalid APP_SECRET_KEY provided.") from e
+derived_key = derive_key(APP_SECRET_KEY_PHRASE)
+
+# Built on first use so importing this module doesn't load the OpenSSL bindings.
+_fernet: Optional["Fernet"] = None
+
+
+def _get_fernet() -> "Fernet":
+    global _fernet
+    if _fernet is None:
+        from cryptography.fernet import Fernet
+
+        try:
+            _fernet = Fernet(derived_key)
+        except Exception as e:
+            logger.error(
+                f"Failed to initialize encryption service. Your APP_SECRET_KEY may be invalid. Error: {e}"
+            )
+            raise ValueError("Invalid APP_SECRET_KEY provided.") from e
+    return _fernet
 
 
 def encrypt(data: str) -> str:
     """Encrypts a string."""
     try:
-        return fernet.encrypt(data.encode()).decode()
+        return _get_fernet().encrypt(data.encode()).decode()
     except Exception as e:
         logger.error(f"Encryption failed: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to encrypt data.")
@@ -53,7 +67,7 @@ def encrypt(data: str) -> str:
 def decrypt(encrypted_data: str) -> str:
     """Decrypts a string."""
     try:
-        return fernet.decrypt(encrypted_data.encode()).decode()
+        return _get_fernet().decrypt(encrypted_data.encode()).decode()
     except Exception as e:
         logger.error(f"Decryption failed: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to decrypt data.")
@@ -0,0 +1,79 @@
+from functools import lru_cache
+from typing import List, Optional
+
+import soupsieve
+from bs4 import BeautifulSoup
+from selectolax.lexbor import LexborHTMLParser, SelectolaxError
+
+# Pages are matched with selectolax, which is much faster than BeautifulSoup.
+# Selectors it can't parse but soupsieve can (e.g. :-soup-contains() or the
+# older :contains()) are matched against a BeautifulSoup parse of the page, so
+# selectors saved before the switch to selectolax keep working.
+
+_SELECTOR_PROBE = LexborHTMLParser("")
+
+
+@lru_cache(maxsize=1024)
+def _lexbor_supports(selector: str) -> bool:
+    try:
+        _SELECTOR_PROBE.css(selector)
+    except SelectolaxError:
+        return False
+    return True
+
+
+@lru_cache(maxsize=1024)
+def selector_error(selector: str) -> Optional[str]:
+    """
+    Returns why a CSS selector is invalid, or None if selectolax or soupsieve
+    can parse it. Cached, since every page of a crawl uses the same selectors.
+    """
+    if _lexbor_supports(selector):
+        return None
+    try:
+        soupsieve.compile(selector)
+    except soupsieve.SelectorSyntaxError as e:
+        return str(e)
+    return None
+
+
+def group_selectors(selectors: List[str]) -> List[str]:
+    """
+    Joins valid selectors into at most two selector lists: one selectolax can
+    run and one that needs soupsieve. Each page is then searched once per list.
+    """
+    lexbor_selectors = [s for s in selectors if _lexbor_supports(s)]
+    soupsieve_selectors = [s for s in selectors if not _lexbor_supports(s)]
+    return [
+        ", ".join(group) for group in (lexbor_selectors, soupsieve_selectors) if group
+    ]
+
+
+class ParsedPage:
+    """An HTML page, parsed with BeautifulSoup only if a selector needs it."""
+
+    def __init__(self, html: str):
+        self._html = html
+        self.tree = LexborHTMLParser(html)
+        self._soup: Optional[BeautifulSoup] = None
+
+    def _get_soup(self) -> BeautifulSoup:
+        if self._soup is None:
+            self._soup = BeautifulSoup(self._html, "html.parser")
+        return self._soup
+
+    def hrefs(self, selector: str) -> List[str]:
+        """Returns the href of every matched element that has one."""
+        if _lexbor_supports(selector):
+            nodes = self.tree.css(selector)
+            return [href for node in nodes if (href := node.attributes.get("href"))]
+        hrefs = [tag.get("href") for tag in self._get_soup().select(selector)]
+        return [href for href in hrefs if href]  # pyright: ignore[reportReturnType]
+
+    def first_href(self, selector: str) -> Optional[str]:
+        """Returns the href of the first matched element, if it has one."""
+        if _lexbor_supports(selector):
+            node = self.tree.css_first(selector)
+            return node.attributes.get("href") if node else None
+        tag = self._get_soup().select_one(selector)
+        return tag.get("href") if tag else None  # pyright: ignore[reportReturnType]
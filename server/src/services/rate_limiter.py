@@ -1,14 +1,11 @@
 import asyncio
-from collections import defaultdict
-from datetime import datetime, timedelta
-from typing import List
+from typing import Dict, List
 import uuid
 
 from controllers.sse import SSEController
 from db.background_jobs import (
     BackgroundJob,
     UpdateBackgroundJob,
-    get_background_job,
     update_background_job,
 )
 from db.character_cards import CharacterCard
@@ -20,45 +17,88 @@ from logging_config import get_logger
 
 logger = get_logger(__name__)
 
-_rate_limit_tracker = defaultdict(list)  # project_id -> list of timestamps
-_rate_limit_locks = defaultdict(asyncio.Lock)  # project_id -> asyncio.Lock
-
+RATE_LIMIT_WINDOW = 60.0
 
 CONCURRENT_REQUESTS = 10
 
 
-async def wait_for_rate_limit(project_id: str, requests_per_minute: int):
+class _ProjectRateLimit:
     """
-    Waits if necessary to respect rate limiting.
-    This function is thread-safe.
+    One permit per request allowed in the current window. A request takes a
+    permit and hands it back a minute later, so at most `limit` requests start
+    in any 60-second window. Waiting requests are let through in arrival order.
     """
-    await _rate_limit_locks[project_id].acquire()
-    try:
-        now = datetime.now()
-        one_minute_ago = now - timedelta(minutes=1)
 
-        # Clean up old timestamps
-        timestamps = _rate_limit_tracker[project_id]
-        _rate_limit_tracker[project_id] = [
-            ts for ts in timestamps if ts > one_minute_ago
-        ]
+    def __init__(self, limit: int):
+        self.limit = limit
+        # Requests holding or waiting for a permit.
+        self.users = 0
+        self._semaphore = asyncio.Semaphore(limit)
+        # Permits owed after the limit was lowered. They are kept back as they
+        # come home instead of being handed out again.
+        self._withheld = 0
+
+    async def acquire(self) -> None:
+        if self._semaphore.locked():
+            logger.info("Rate limit reached, waiting for the window to free up")
+        self.users += 1
+        try:
+            await self._semaphore.acquire()
+        except BaseException:
+            self.users -= 1
+            raise
+
+    def release(self) -> None:
+        self.users -= 1
+        if self._withheld:
+            self._withheld -= 1
+        else:
+            self._semaphore.release()
+
+    async def set_limit(self, limit: int) -> None:
+        """Changes the limit, counting the requests already in the window against it."""
+        if limit > self.limit:
+            added = limit - self.limit
+            repaid = min(added, self._withheld)
+            self._withheld -= repaid
+            for _ in range(added - repaid):
+                self._semaphore.release()
+        elif limit < self.limit:
+            self._withheld += self.limit - limit
+            # Take back the permits nobody holds right away; the rest are
+            # kept back as the requests holding them expire.
+            while self._withheld and not self._semaphore.locked():
+                await self._semaphore.acquire()
+                self._withheld -= 1
+        self.limit = limit
+
+
+# One limiter per project, dropped again once no request holds or waits for
+# one of its permits.
+_rate_limits: Dict[str, _ProjectRateLimit] = {}
+
+
+def _release_rate_limit(project_id: str, rate_limit: _ProjectRateLimit) -> None:
+    rate_limit.release()
+    if not rate_limit.users and _rate_limits.get(project_id) is rate_limit:
+        del _rate_limits[project_id]
 
-        # Check if we need to wait
-        if len(_rate_limit_tracker[project_id]) >= requests_per_minute:
-            oldest_timestamp = min(_rate_limit_tracker[project_id])
-            sleep_until = oldest_timestamp + timedelta(minutes=1)
-            sleep_time = (sleep_until - now).total_seconds()
 
-            if sleep_time > 0:
-                logger.info(
-                    f"Rate limit reached, sleeping for {sleep_time:.2f} seconds"
-                )
-                await asyncio.sleep(sleep_time)
+async def wait_for_rate_limit(project_id: str, requests_per_minute: int):
+    """
+    Waits if necessary to respect rate limiting.
+    Waiting requests are let through in arrival order.
+    """
+    rate_limit = _rate_limits.get(project_id)
+    if rate_limit is None:
+        rate_limit = _rate_limits[project_id] = _ProjectRateLimit(requests_per_minute)
+    elif rate_limit.limit != requests_per_minute:
+        await rate_limit.set_limit(requests_per_minute)
 
-        # Record the new request time *after* waiting
-        _rate_limit_tracker[project_id].append(datetime.now())
-    finally:
-        _rate_limit_locks[project_id].release()
+    await rate_limit.acquire()
+    asyncio.get_running_loop().call_later(
+        RATE_LIMIT_WINDOW, _release_rate_limit, project_id, rate_limit
+    )
 
 
 async def update_job_with_notification(
@@ -74,14 +114,15 @@ async def update_job_with_notification(
 async def send_job_status_notification(job: BackgroundJob):
     """Send SSE notification about job status change."""
     try:
-        # Fetch the latest job state to include progress
-        latest_job = await get_background_job(job.id)
-        if latest_job:
-            await SSEController.send_event_to_project(
-                project_id=job.project_id,
-                event_type="job_status_update",
-                data=latest_job.model_dump(),
-            )
+        # The job passed in is the row returned by the update itself, so it
+        # already carries the latest progress. Re-fetching it would cost a
+        # round trip per update and, from outside the update's transaction,
+        # could only see the previous state.
+        await SSEController.send_event_to_project(
+            project_id=job.project_id,
+            event_type="job_status_update",
+            data=job.model_dump(),
+        )
     except Exception as e:
         logger.error(f"Error sending SSE notification: {e}", exc_info=True)
 
@@ -100,6 +141,9 @@ async def send_entry_created_notification(job: BackgroundJob, entry: LorebookEnt
 
 async def send_links_created_notification(job: BackgroundJob, links: List[Link]):
     """Send SSE notification about link status change."""
+    # Link batches can hold hundreds of models; don't dump them for nobody.
+    if not SSEController.has_subscribers(job.project_id):
+        return
     try:
         await SSEController.send_event_to_project(
             project_id=job.project_id,
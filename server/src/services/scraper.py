@@ -1,9 +1,129 @@
-from typing import Literal
+import asyncio
+from typing import Dict, List, Literal, Optional, Sequence, Set
 from html_to_markdown import convert_to_markdown
 import httpx
 from bs4 import BeautifulSoup
 from bs4.element import Tag as Bs4Tag  # type: ignore
 
+# Simple selectors ("tag", "#id", ".class" or '[attr="value"]') indexed by the
+# attribute they test, then by value, to the selectors' positions in their list.
+# "" stands for the tag name.
+SelectorIndex = Dict[str, Dict[str, List[int]]]
+
+
+def _index_selectors(selectors: Sequence[str]) -> SelectorIndex:
+    index: SelectorIndex = {}
+    for position, selector in enumerate(selectors):
+        if selector.startswith("#"):
+            attribute, value = "id", selector[1:]
+        elif selector.startswith("."):
+            attribute, value = "class", selector[1:]
+        elif selector.startswith("["):
+            attribute, _, value = selector[1:-1].partition("=")
+            value = value.strip('"')
+        else:
+            attribute, value = "", selector
+        index.setdefault(attribute, {}).setdefault(value, []).append(position)
+    return index
+
+
+def _matching_selectors(element: Bs4Tag, index: SelectorIndex) -> Set[int]:
+    """Positions of the indexed selectors that match the element."""
+    positions: Set[int] = set()
+    for attribute, selectors_by_value in index.items():
+        if not attribute:
+            values = [element.name]
+        else:
+            value = element.get(attribute)
+            if value is None:
+                continue
+            # Multi-valued attributes such as class come back as lists.
+            values = value if isinstance(value, list) else [value]
+        for value in values:
+            positions.update(selectors_by_value.get(value, ()))
+    return positions
+
+
+# Candidate main-content containers, in order of preference.
+CONTENT_SELECTORS = [
+    "article",
+    "#article",
+    ".article",
+    "main",
+    "#main",
+    ".main",
+    '[role="main"]',
+    "#content",
+    ".content",
+    ".post",
+]
+_CONTENT_SELECTOR_INDEX = _index_selectors(CONTENT_SELECTORS)
+
+
+def _find_main_content(soup: BeautifulSoup) -> Optional[Bs4Tag]:
+    """
+    Returns the element matched by the first content selector that matches
+    exactly one element, checking every selector in a single walk of the tree.
+    """
+    matches: List[List[Bs4Tag]] = [[] for _ in CONTENT_SELECTORS]
+    for element in soup.find_all(True):
+        for position in _matching_selectors(element, _CONTENT_SELECTOR_INDEX):
+            matches[position].append(element)
+
+    for selector_matches in matches:
+        if len(selector_matches) == 1:
+            return selector_matches[0]
+    return None
+
+
+# Page chrome and non-content elements stripped from the extracted content.
+ELEMENTS_TO_REMOVE = [
+    "header",
+    "footer",
+    "nav",
+    '[role="navigation"]',
+    ".sidebar",
+    '[role="complementary"]',
+    ".nav",
+    ".menu",
+    ".header",
+    ".footer",
+    ".advertisement",
+    ".ads",
+    ".cookie-notice",
+    ".social-share",
+    ".related-posts",
+    ".comments",
+    "#comments",
+    ".popup",
+    ".modal",
+    ".overlay",
+    ".banner",
+    ".alert",
+    ".notification",
+    ".subscription",
+    ".newsletter",
+    ".share-buttons",
+    "script",
+    "style",
+    "noscript",
+    "iframe",
+    "button",
+    "form",
+    "input",
+    "textarea",
+    "select",
+    ".noprint",
+]
+_REMOVE_SELECTOR_INDEX = _index_selectors(ELEMENTS_TO_REMOVE)
+
+_STRIPPED_ATTRIBUTE_PREFIXES = ("on", "aria-", "data-", "role")
+_STRIPPED_ATTRIBUTES = frozenset(["style", "target", "src"])
+
+
+def _is_boilerplate(element: Bs4Tag) -> bool:
+    return bool(_matching_selectors(element, _REMOVE_SELECTOR_INDEX))
+
 
 def clean_html(html_content: str) -> str:
     """
@@ -15,82 +135,25 @@ def clean_html(html_content: str) -> str:
 
     soup = BeautifulSoup(html_content, "lxml")
 
-    content_selectors = [
-        "article",
-        "#article",
-        ".article",
-        "main",
-        "#main",
-        ".main",
-        '[role="main"]',
-        "#content",
-        ".content",
-        ".post",
-    ]
-
-    content = None
-    for selector in content_selectors:
-        selected = soup.select(selector)
-        if len(selected) == 1:
-            content = selected[0]
-            break
+    content = _find_main_content(soup)
 
     target = content if content else soup.body
     if not target:
         target = soup
 
-    elements_to_remove = [
-        "header",
-        "footer",
-        "nav",
-        '[role="navigation"]',
-        ".sidebar",
-        '[role="complementary"]',
-        ".nav",
-        ".menu",
-        ".header",
-        ".footer",
-        ".advertisement",
-        ".ads",
-        ".cookie-notice",
-        ".social-share",
-        ".related-posts",
-        ".comments",
-        "#comments",
-        ".popup",
-        ".modal",
-        ".overlay",
-        ".banner",
-        ".alert",
-        ".notification",
-        ".subscription",
-        ".newsletter",
-        ".share-buttons",
-        "script",
-        "style",
-        "noscript",
-        "iframe",
-        "button",
-        "form",
-        "input",
-        "textarea",
-        "select",
-        ".noprint",
-    ]
-
-    for element in target.select(", ".join(elements_to_remove)):
-        element.decompose()
+    # Matches come back in document order, so anything nested in an element
+    # that was already removed has gone with it and is skipped.
+    for element in target.find_all(_is_boilerplate):
+        if not element.decomposed:
+            element.decompose()
 
     for html_element in target.find_all(True):
         if isinstance(html_element, Bs4Tag):
             html_element.attrs = {
                 key: value
                 for key, value in html_element.attrs.items()
-                if not key.startswith("on")
-                and not key.startswith("aria-")
-                and not key.startswith("data-")
-                and not key.startswith("role")
-                and key not in ["style", "target", "src"]
+                if not key.startswith(_STRIPPED_ATTRIBUTE_PREFIXES)
+                and key not in _STRIPPED_ATTRIBUTES
             }
             # if "src" in html_element.attrs:
             #     src = html_element.attrs["src"]
@@ -108,15 +171,56 @@ def clean_html(html_content: str) -> str:
 
 
 def html_to_markdown(html_content: str) -> str:
-    soup = BeautifulSoup(clean_html(html_content), "lxml")
-    return convert_to_markdown(str(soup)).strip()
+    # convert_to_markdown parses the HTML itself, so the cleaned string is
+    # handed over as is rather than parsed and serialised again first.
+    return convert_to_markdown(clean_html(html_content)).strip()
+
+
+def _render_page(
+    html: str, type: Literal["html", "markdown"], clean: bool, pretty: bool
+) -> str:
+    """Converts a fetched page into the output format asked of `get_content`."""
+    if type == "markdown":
+        # html_to_markdown cleans the page itself; cleaning here as well
+        # would run the whole BeautifulSoup pass twice.
+        return html_to_markdown(html)
+    if clean:
+        html = clean_html(html)
+
+    if pretty and type == "html":
+        html = BeautifulSoup(html, "lxml").prettify()
+    return html.strip()
 
 
 class Scraper:
-    """A simple scraper to fetch and parse web content."""
+    """
+    A simple scraper to fetch and parse web content.
+    All requests made through one instance share an HTTP client, so keep-alive
+    connections are reused; call `aclose()` (or use `async with`) when done.
+    """
 
     def __init__(self, timeout: int = 10):
         self.timeout = timeout
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                follow_redirects=True, cookies={"ageVerified": "true"}
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        """Closes the shared HTTP client and its pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def __aenter__(self) -> "Scraper":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
 
     async def get_content(
         self,
@@ -129,19 +233,16 @@ class Scraper:
         Fetches the content of a URL.
         Returns the HTML content as a string.
         """
-        cookies = {"ageVerified": "true"}
-        async with httpx.AsyncClient(follow_redirects=True) as client:
-            response = await client.get(url, timeout=self.timeout, cookies=cookies)
+        # Stream so a non-HTML response is rejected on its headers, before its
+        # body (which may be a large file) is downloaded.
+        async with self._get_client().stream(
+            "GET", url, timeout=self.timeout
+        ) as response:
             response.raise_for_status()
             content_type = response.headers.get("Content-Type", "")
             if "text/html" not in content_type:
                 raise ValueError(f"Invalid content type: {content_type}")
-            html = response.text
-            if clean:
-                html = clean_html(html)
-            if type == "markdown":
-                return html_to_markdown(html)
-
-            if pretty and type == "html":
-                html = BeautifulSoup(html, "lxml").prettify()
-            return html.strip()
+            await response.aread()
+        # Parsing a large page can take a good fraction of a second, so it runs
+        # in a thread to keep the event loop serving other requests meanwhile.
+        return await asyncio.to_thread(_render_page, response.text, type, clean, pretty)
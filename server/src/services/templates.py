@@ -1,6 +1,7 @@
 import re
-from typing import Dict, Any, Literal
-from jinja2 import Environment, FileSystemLoader
+from functools import lru_cache
+from typing import Dict, Any, Literal, Optional, Tuple
+from jinja2 import Environment, FileSystemLoader, Template, TemplateSyntaxError
 from providers.index import ChatMessage
 from logging_config import get_logger
 
@@ -12,43 +13,38 @@ env = Environment(
     lstrip_blocks=True,
 )
 
+# Looks for "--- role: <rolename>" at the beginning of a line, capturing the role
+# and all content until the next such delimiter or the end of the string.
+ROLE_DELIMITER_PATTERN = re.compile(
+    r"^---\s*role:\s*(\w+)\s*\n(.*?)(?=\n^---\s*role:|\Z)", re.S | re.M
+)
 
-def render_prompt(template_str: str, context: Dict[str, Any]) -> str:
-    """Renders a prompt from a template string and context."""
-    template = env.from_string(template_str)
-    return template.render(context)
+MessageRole = Literal["system", "user", "assistant"]
 
 
-def create_messages_from_template(
-    template_str: str, context: dict
-) -> list[ChatMessage]:
-    """
-    Creates a list of ChatMessage objects from a template string.
-    This version uses a more robust delimiter "--- role: <role>" to avoid
-    conflicts with markdown horizontal rules.
-    """
-    messages = []
+@lru_cache(maxsize=256)
+def _compile_template(template_str: str) -> Template:
+    """Parses a template string once; later renders reuse the compiled template."""
+    return env.from_string(template_str)
 
-    # The pattern now looks for "--- role: <rolename>" at the beginning of a line,
-    # capturing the role and all content until the next such delimiter or the end of the string.
-    pattern = re.compile(
-        r"^---\s*role:\s*(\w+)\s*\n(.*?)(?=\n^---\s*role:|\Z)", re.S | re.M
-    )
-    matches = pattern.findall(template_str)
+
+@lru_cache(maxsize=256)
+def _compile_message_template(
+    template_str: str,
+) -> Tuple[Tuple[MessageRole, Template], ...]:
+    """Splits a message template into its role blocks and compiles each one."""
+    matches = ROLE_DELIMITER_PATTERN.findall(template_str)
 
     if not matches:
         # If no delimiters are found, treat the whole template as a single user message.
         # This provides backward compatibility for simple, single-message prompts.
         if template_str.strip():
-            messages.append(
-                ChatMessage(
-                    role="user", content=render_prompt(template_str.strip(), context)
-                )
-            )
-        return messages
+            return (("user", _compile_template(template_str.strip())),)
+        return ()
 
+    blocks = []
     for role_str, content_str in matches:
-        role: Literal["system", "user", "assistant"] = "user"
+        role: MessageRole = "user"
         cleaned_role = role_str.strip().lower()
 
         if cleaned_role in ("system", "user", "assistant"):
@@ -56,8 +52,37 @@ def create_messages_from_template(
 
         content = content_str.strip()
         if content:
-            messages.append(
-                ChatMessage(role=role, content=render_prompt(content, context))
-            )
+            blocks.append((role, _compile_template(content)))
+
+    return tuple(blocks)
+
 
-    return messages
+def warm_template_cache(*template_strs: Optional[str]) -> None:
+    """Compiles message templates ahead of time so the first render doesn't pay for parsing."""
+    for template_str in template_strs:
+        if not template_str:
+            continue
+        try:
+            _compile_message_template(template_str)
+        except TemplateSyntaxError as e:
+            # Left for the render itself to surface where it is handled.
+            logger.warning(f"Could not precompile template: {e}")
+
+
+def render_prompt(template_str: str, context: Dict[str, Any]) -> str:
+    """Renders a prompt from a template string and context."""
+    return _compile_template(template_str).render(context)
+
+
+def create_messages_from_template(
+    template_str: str, context: dict
+) -> list[ChatMessage]:
+    """
+    Creates a list of ChatMessage objects from a template string.
+    This version uses a more robust delimiter "--- role: <role>" to avoid
+    conflicts with markdown horizontal rules.
+    """
+    return [
+        ChatMessage(role=role, content=template.render(context))
+        for role, template in _compile_message_template(template_str)
+    ]
@@ -1,12 +1,9 @@
 import asyncio
+from collections import Counter
 
 from db.background_jobs import (
     PARALLEL_LIMITS,
-    JobStatus,
-    UpdateBackgroundJob,
-    count_in_progress_background_jobs_by_task_name,
-    get_and_lock_pending_background_job,
-    update_background_job,
+    get_and_lock_pending_background_jobs,
 )
 from services.background_jobs import process_background_job
 from logging_config import get_logger
@@ -14,6 +11,19 @@ from logging_config import get_logger
 logger = get_logger(__name__)
 
 
+async def _idle(active_tasks, timeout: float):
+    """
+    Waits up to `timeout` seconds, returning early as soon as a running job
+    finishes so its slot can be reused right away.
+    """
+    if active_tasks:
+        await asyncio.wait(
+            active_tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+        )
+    else:
+        await asyncio.sleep(timeout)
+
+
 async def run_worker():
     """
     Main loop for the background worker.
@@ -22,69 +32,54 @@ async def run_worker():
     """
     logger.info("Starting background worker...")
 
-    # Track active tasks by job ID
+    # Track active tasks by job ID, and how many are running per task type
     active_tasks = {}
+    active_counts = Counter()
 
     while True:
         try:
             # Clean up completed tasks
-            completed_tasks = []
-            for task, job_id in active_tasks.items():
-                if task.done():
-                    completed_tasks.append(task)
-                    try:
-                        await task  # Raise exceptions if any
-                        logger.info(f"Job {job_id} completed successfully.")
-                    except Exception as e:
-                        logger.error(
-                            f"Job {job_id} failed with an exception: {e}",
-                            exc_info=True,
-                        )
-
-            # Remove completed tasks
-            for task in completed_tasks:
-                del active_tasks[task]
+            for task in [task for task in active_tasks if task.done()]:
+                job_id, task_name = active_tasks.pop(task)
+                active_counts[task_name] -= 1
+                try:
+                    await task  # Raise exceptions if any
+                    logger.info(f"Job {job_id} completed successfully.")
+                except Exception as e:
+                    logger.error(
+                        f"Job {job_id} failed with an exception: {e}",
+                        exc_info=True,
+                    )
 
             # Check if we can schedule more jobs
             max_workers = sum(PARALLEL_LIMITS.values())
 
             if len(active_tasks) < max_workers:
-                # Use the new atomic function to get and lock a job
-                job = await get_and_lock_pending_background_job()
-                if job:
+                # Claim every job there is room for in one round trip, up to
+                # the free slots of each task type, so a saturated type doesn't
+                # hold up pending jobs of other types. This worker runs every
+                # job, so its own counts are the source of truth.
+                free_slots = {
+                    task_name: limit - active_counts[task_name]
+                    for task_name, limit in PARALLEL_LIMITS.items()
+                    if active_counts[task_name] < limit
+                }
+                jobs = await get_and_lock_pending_background_jobs(free_slots)
+                for job in jobs:
                     task_name = job.task_name
-                    limit = PARALLEL_LIMITS.get(task_name, 1)
-                    # We check active_jobs *after* successfully claiming one
-                    active_jobs_for_task = (
-                        await count_in_progress_background_jobs_by_task_name(task_name)
+                    logger.info(
+                        f"Worker: Submitting job {job.id} (Task: {task_name.value}, "
+                        f"Active: {active_counts[task_name] + 1}, "
+                        f"Limit: {PARALLEL_LIMITS.get(task_name, 1)})"
                     )
-
-                    if (
-                        active_jobs_for_task <= limit
-                    ):  # Check is now <= because we already set one to in_progress
-                        logger.info(
-                            f"Worker: Submitting job {job.id} (Task: {task_name.value}, "
-                            f"Active: {active_jobs_for_task}, Limit: {limit})"
-                        )
-                        task = asyncio.create_task(process_background_job(job.id))
-                        active_tasks[task] = job.id
-                    else:
-                        # This case is less likely now but good for safety.
-                        # We claimed a job but the limit for its type is full.
-                        # Revert its status back to pending.
-                        logger.warning(
-                            f"Limit for {task_name.value} reached. Re-queueing job {job.id}"
-                        )
-
-                        await update_background_job(
-                            job.id, UpdateBackgroundJob(status=JobStatus.pending)
-                        )
-                        await asyncio.sleep(2)
-                else:
+                    task = asyncio.create_task(process_background_job(job.id))
+                    active_tasks[task] = (job.id, task_name)
+                    active_counts[task_name] += 1
+                if not jobs:
                     logger.debug("No pending jobs found. Still polling.")
-                    await asyncio.sleep(2)
+                    await _idle(active_tasks, 2)
             else:
-                await asyncio.sleep(1)
+                await _idle(active_tasks, 1)
 
         except Exception as e:
             logger.error(f"Worker main loop encountered an error: {e}", exc_info=True)
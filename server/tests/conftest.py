@@ -25,9 +25,14 @@ def postgres_container():
         yield postgres
 
 
-@pytest_asyncio.fixture(scope="session")
-async def db(db_type: str, postgres_container: PostgresContainer, tmp_path_factory):
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def db(db_type: str, request, tmp_path_factory):
     if db_type == "postgres":
+        # Requested here rather than as an argument so that sqlite-only runs
+        # never start the container.
+        postgres_container: PostgresContainer = request.getfixturevalue(
+            "postgres_container"
+        )
         dsn = postgres_container.get_connection_url().replace("+psycopg2", "")
         db_instance = PostgresDB(dsn)
     elif db_type == "sqlite":
@@ -44,9 +49,10 @@ async def db(db_type: str, postgres_container: PostgresContainer, tmp_path_facto
     await close_database()
 
 
-@pytest_asyncio.fixture(scope="function")
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
 async def client_test(db: AsyncDB):
+    # One app for the whole session: its startup hooks run once, and its
+    # shutdown hook (close_database) only runs after the last test.
     app = create_app()
-    async with db.transaction():
-        async with AsyncTestClient(app) as client:
-            yield client
+    async with AsyncTestClient(app) as client:
+        yield client
@@ -4,11 +4,24 @@ import pytest_asyncio
 from litestar.testing import AsyncTestClient
 from uuid import UUID
 
+from db.background_jobs import (
+    ConfirmLinksPayload,
+    CreateBackgroundJob,
+    GenerateSearchParamsPayload,
+    JobStatus,
+    ProcessProjectEntriesPayload,
+    TaskName,
+    create_background_job,
+    get_and_lock_pending_background_jobs,
+    get_background_job,
+)
+from db.credentials import CreateCredential, CredentialValues, create_credential
 from db.database import AsyncDB, PostgresDB, SQLiteDB
 from db.projects import (
     CreateProject,
     ProjectTemplates,
     ProjectType,
+    create_project,
 )
 from default_templates import (
     selector_prompt,
@@ -19,43 +32,58 @@ from default_templates import (
 )
 from services.background_jobs import process_background_job
 
+OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
+
+# Shared by both project payloads; no test modifies the templates.
+DEFAULT_TEMPLATES = ProjectTemplates(
+    selector_generation=selector_prompt,
+    entry_creation=entry_creation_prompt,
+    search_params_generation=search_params_prompt,
+    character_generation=character_generation_prompt,
+    character_field_regeneration=character_field_regeneration_prompt,
+)
+
+# Tables emptied after every test, and the matching single Postgres statement.
+# Credential is kept: the session-wide credential_id fixture lives there.
+CLEANUP_TABLES = (
+    "Project",
+    "ProjectSource",
+    "ProjectSourceHierarchy",
+    "BackgroundJob",
+    "ApiRequestLog",
+    "Link",
+    "LorebookEntry",
+    "GlobalTemplate",
+    "CharacterCard",
+)
+TRUNCATE_CLEANUP_TABLES = (
+    "TRUNCATE " + ", ".join(f'"{table}"' for table in CLEANUP_TABLES) + " CASCADE;"
+)
+
 
 @pytest_asyncio.fixture(autouse=True)
 async def cleanup_tables(db: AsyncDB):
     """Fixture to clean up tables after each test."""
     yield
     if isinstance(db, PostgresDB):
-        await db.execute(
-            'TRUNCATE "Project", "ProjectSource", "ProjectSourceHierarchy", "BackgroundJob", "ApiRequestLog", "Link", "LorebookEntry", "GlobalTemplate", "Credential", "CharacterCard" CASCADE;'
-        )
+        await db.execute(TRUNCATE_CLEANUP_TABLES)
     elif isinstance(db, SQLiteDB):
-        tables = [
-            "Project",
-            "ProjectSource",
-            "ProjectSourceHierarchy",
-            "BackgroundJob",
-            "ApiRequestLog",
-            "Link",
-            "LorebookEntry",
-            "GlobalTemplate",
-            "Credential",
-            "CharacterCard",
-        ]
-        for table in tables:
+        # sqlite3 runs a single statement per execute call.
+        for table in CLEANUP_TABLES:
             await db.execute(f'DELETE FROM "{table}";')
 
 
-@pytest_asyncio.fixture
-async def credential_id(client_test: AsyncTestClient) -> UUID:
-    """Fixture to create a default credential and return its ID."""
-    credential_payload = {
-        "name": "Test Credential",
-        "provider_type": "openrouter",
-        "values": {"api_key": os.getenv("OPENROUTER_API_KEY")},
-    }
-    response = await client_test.post("/api/credentials", json=credential_payload)
-    assert response.status_code == 201
-    return UUID(response.json()["data"]["id"])
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def credential_id(db: AsyncDB) -> UUID:
+    """Fixture to create a default credential once per session and return its ID."""
+    credential = await create_credential(
+        CreateCredential(
+            name="Test Credential",
+            provider_type="openrouter",
+            values=CredentialValues(api_key=OPENROUTER_API_KEY),
+        )
+    )
+    return credential.id
 
 
 @pytest.fixture
@@ -66,13 +94,7 @@ def lorebook_project_payload(credential_id: UUID) -> CreateProject:
         name="Skyrim Locations (Integration Test)",
         project_type=ProjectType.LOREBOOK,
         prompt="Skyrim locations",
-        templates=ProjectTemplates(
-            selector_generation=selector_prompt,
-            entry_creation=entry_creation_prompt,
-            search_params_generation=search_params_prompt,
-            character_generation=character_generation_prompt,
-            character_field_regeneration=character_field_regeneration_prompt,
-        ),
+        templates=DEFAULT_TEMPLATES,
         credential_id=credential_id,
         model_name="google/gemini-2.5-flash",
         model_parameters={"temperature": 0.7},
@@ -87,13 +109,7 @@ def character_project_payload(credential_id: UUID) -> CreateProject:
         name="Lydia Character (Integration Test)",
         project_type=ProjectType.CHARACTER,
         prompt="Lydia, the loyal housecarl from Whiterun in Skyrim.",
-        templates=ProjectTemplates(
-            character_generation=character_generation_prompt,
-            character_field_regeneration=character_field_regeneration_prompt,
-            entry_creation=entry_creation_prompt,
-            search_params_generation=search_params_prompt,
-            selector_generation=selector_prompt,
-        ),
+        templates=DEFAULT_TEMPLATES,
         credential_id=credential_id,
         model_name="google/gemini-2.5-flash",
         model_parameters={"temperature": 0.7},
@@ -202,8 +218,8 @@ async def test_generate_character_card_job(
     card_response = await client_test.get(f"/api/projects/{project_id}/character")
     assert card_response.status_code == 200
     card_data = card_response.json()["data"]
-    assert card_data["name"] is not None and len(card_data["name"]) > 0
-    assert card_data["description"] is not None and len(card_data["description"]) > 0
+    assert card_data["name"]
+    assert card_data["description"]
 
     project_response = await client_test.get(f"/api/projects/{project_id}")
     assert project_response.json()["data"]["status"] == "completed"
@@ -362,9 +378,9 @@ async def test_discover_and_crawl_job_with_test_client(
     assert sources_response.status_code == 200
     sources_data = sources_response.json()
     assert len(sources_data) >= 1
-    source_data = next(s for s in sources_data if s["id"] == source_id)
-    assert source_data["link_extraction_selector"] is not None
-    assert len(source_data["link_extraction_selector"]) > 0
+    sources_by_id = {s["id"]: s for s in sources_data}
+    source_data = sources_by_id[source_id]
+    assert source_data["link_extraction_selector"]
 
     # 7. Verify the API log was created
     response = await client_test.get(f"/api/projects/{project_id}/logs")
@@ -552,10 +568,8 @@ async def test_confirm_links_job_with_test_client(
     links_data = response.json()
     assert links_data["meta"]["total_items"] == len(test_links)
     # Check if one of the URLs is in the created links
-    assert any(
-        link["url"] == "https://elderscrolls.fandom.com/wiki/A_Bandit%27s_Book"
-        for link in links_data["data"]
-    )
+    link_urls = {link["url"] for link in links_data["data"]}
+    assert "https://elderscrolls.fandom.com/wiki/A_Bandit%27s_Book" in link_urls
 
 
 @pytest.mark.asyncio
@@ -626,8 +640,7 @@ async def test_process_project_entries_job_with_test_client(
     entries_data = response.json()
     assert entries_data["meta"]["total_items"] >= 0
     for entry in entries_data["data"]:
-        assert entry["content"] is not None
-        assert len(entry["content"]) > 0
+        assert entry["content"]
 
     # 8. Verify the API logs were created
     response = await client_test.get(f"/api/projects/{project_id}/logs")
@@ -697,3 +710,55 @@ async def test_discover_and_crawl_with_url_exclusions(
         assert "A_Bloody_Trail" not in link
         assert "/wiki/Special:" not in link
         assert "(Online)" not in link
+
+
+# --- Worker Tests ---
+
+
+@pytest.mark.asyncio
+async def test_get_and_lock_pending_background_jobs_respects_free_slots(
+    lorebook_project_payload: CreateProject,
+):
+    """
+    The worker's claim query takes the oldest pending jobs of each task type,
+    up to that type's free slots, and leaves types without free slots pending.
+    """
+    # Arrange
+    project = await create_project(lorebook_project_payload)
+
+    async def create_job(task_name: TaskName, payload):
+        return await create_background_job(
+            CreateBackgroundJob(
+                task_name=task_name, project_id=project.id, payload=payload
+            )
+        )
+
+    confirm_jobs = [
+        await create_job(TaskName.CONFIRM_LINKS, ConfirmLinksPayload(urls=[]))
+        for _ in range(3)
+    ]
+    search_params_jobs = [
+        await create_job(TaskName.GENERATE_SEARCH_PARAMS, GenerateSearchParamsPayload())
+        for _ in range(2)
+    ]
+    entries_job = await create_job(
+        TaskName.PROCESS_PROJECT_ENTRIES, ProcessProjectEntriesPayload()
+    )
+
+    # Act
+    claimed_jobs = await get_and_lock_pending_background_jobs(
+        {TaskName.CONFIRM_LINKS: 2, TaskName.GENERATE_SEARCH_PARAMS: 1}
+    )
+
+    # Assert
+    assert [job.id for job in claimed_jobs] == [
+        confirm_jobs[0].id,
+        confirm_jobs[1].id,
+        search_params_jobs[0].id,
+    ]
+    assert all(job.status == JobStatus.in_progress for job in claimed_jobs)
+
+    for job in (confirm_jobs[2], search_params_jobs[1], entries_job):
+        stored_job = await get_background_job(job.id)
+        assert stored_job is not None
+        assert stored_job.status == JobStatus.pending